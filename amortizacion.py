@@ -0,0 +1,97 @@
+"""Amortización del saldo final (liquidación contra entrega) con crédito bancario o del desarrollador.
+
+Las tablas se calculan como arreglos de NumPy sobre todos los meses a la vez (sin
+recorrer el plazo mes por mes), así que una tabla de 360 pagos cuesta lo mismo que
+una de 12:
+
+- Francés: pago fijo; el interés baja y el capital sube cada mes.
+- Alemán: capital fijo; el pago baja conforme baja el saldo.
+
+Los abonos extraordinarios reducen el plazo (se conserva el pago del esquema) y el
+último pago se ajusta al saldo que quede.
+"""
+import numpy as np
+
+FRANCES, ALEMAN = "Francés", "Alemán"
+ESQUEMAS = (FRANCES, ALEMAN)
+PLAZO_CREDITO_MIN, PLAZO_CREDITO_MAX = 60, 360
+PLAZOS_CREDITO = tuple(range(PLAZO_CREDITO_MIN, PLAZO_CREDITO_MAX + 1, 12))
+PLAZO_CREDITO_DEFAULT = 240
+TASA_CREDITO_DEFAULT = 0.115  # anual
+COLUMNAS_TABLA = ("mes", "pago", "interes", "capital", "abono", "saldo")
+
+
+def abonos_periodicos(meses, abono_anual=0.0, abono_unico=0.0, mes_unico=12):
+    """Arreglo (meses,) de abonos extra: `abono_anual` cada 12 meses y `abono_unico` en `mes_unico`."""
+    abonos = np.zeros(meses)
+    if abono_anual > 0:
+        abonos[11::12] = abono_anual
+    if abono_unico > 0 and 1 <= mes_unico <= meses:
+        abonos[mes_unico - 1] += abono_unico
+    return abonos
+
+def pago_frances(saldo, tasa_anual, meses):
+    r = tasa_anual / 12
+    return saldo / meses if r == 0 else saldo * r / (1 - (1 + r) ** -meses)
+
+def amortizar(saldo, tasa_anual, meses, esquema=FRANCES, abonos=None):
+    """Tabla de amortización como dict de arreglos (COLUMNAS_TABLA), uno por mes pagado.
+
+    `abonos` es un arreglo de abonos extra por mes (largo `meses`); con abonos la
+    tabla puede terminar antes del plazo.
+    """
+    if esquema not in ESQUEMAS:
+        raise ValueError(f"Esquema desconocido: {esquema}")
+    if not PLAZO_CREDITO_MIN <= meses <= PLAZO_CREDITO_MAX:
+        raise ValueError(f"El plazo debe estar entre {PLAZO_CREDITO_MIN} y {PLAZO_CREDITO_MAX} meses")
+    meses = int(meses)
+    r = tasa_anual / 12
+    k = np.arange(1, meses + 1)
+    extra = np.zeros(meses) if abonos is None else np.asarray(abonos, dtype=float)[:meses]
+    extra_acum = np.cumsum(extra)
+
+    if esquema == FRANCES:
+        pago = pago_frances(saldo, tasa_anual, meses)
+        # Recurrencia S_k = S_{k-1}(1+r) - pago - extra_k resuelta en forma cerrada:
+        # S_k = (1+r)^k * (S_0 - Σ_{j<=k} (pago + extra_j) / (1+r)^j)
+        crec = (1 + r) ** k
+        saldos = crec * (saldo - np.cumsum((pago + extra) / crec))
+    else:
+        saldos = saldo - k * (saldo / meses) - extra_acum
+
+    # El crédito se liquida en el primer mes en que el saldo llega a cero
+    liquidado = np.flatnonzero(saldos <= 0.005)
+    n = int(liquidado[0]) + 1 if len(liquidado) else meses
+    saldos = np.maximum(saldos[:n], 0.0)
+    if len(liquidado): saldos[-1] = 0.0
+    saldo_previo = np.concatenate(([saldo], saldos[:-1]))
+    interes = saldo_previo * r
+    extra = extra[:n].copy()
+    capital = pago - interes if esquema == FRANCES else np.full(n, saldo / meses)
+    # Último mes: primero el capital regular y el abono sólo cubre lo que quede
+    capital[-1] = min(capital[-1], saldo_previo[-1])
+    extra[-1] = saldo_previo[-1] - capital[-1]
+
+    return {
+        "mes": k[:n],
+        "pago": interes + capital,
+        "interes": interes,
+        "capital": capital,
+        "abono": extra,
+        "saldo": saldos,
+    }
+
+def resumen_credito(tabla):
+    """Totales de una tabla de `amortizar`."""
+    return {
+        "meses": int(len(tabla["mes"])),
+        "primer_pago": float(tabla["pago"][0]),
+        "ultimo_pago": float(tabla["pago"][-1]),
+        "total_intereses": float(tabla["interes"].sum()),
+        "total_pagado": float(tabla["pago"].sum() + tabla["abono"].sum()),
+    }
+
+def tabla_credito(saldo, credito):
+    """Tabla de `amortizar` para un `credito` (tasa_anual, meses, esquema, abono_anual) como lo guarda la cotización."""
+    tasa_anual, meses, esquema, abono_anual = credito
+    return amortizar(saldo, tasa_anual, meses, esquema, abonos_periodicos(meses, abono_anual))
@@ -1,15 +1,32 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import numpy as np
-from fpdf import FPDF
-from datetime import date
-import base64
+from datetime import date, datetime
+import cProfile
+import os
+import time
+import uuid
+from cotizador import OPCIONES_ENGANCHE, OPCIONES_PLAZO, NUM_LISTAS, matriz_precios, cotizar, optimizar_planes
+from datos import ARCHIVO_PRECIOS, CACHE_DIR, DESARROLLO_DEFAULT, PRECIOS_FUTUROS, desarrollos, leer_precios, inventario_default, superficies
+from proyeccion import proyectar_plusvalia, bandas_montecarlo, simular_renta, TARIFA_DEFAULT, OCUPACION_DEFAULT, ADMIN_DEFAULT, GASTOS_FIJOS_DEFAULT
+from pdf_cotizacion import pdf_cotizacion
+from amortizacion import ESQUEMAS, PLAZOS_CREDITO, PLAZO_CREDITO_DEFAULT, TASA_CREDITO_DEFAULT, resumen_credito, tabla_credito
+from graficas import figura_mercado, figura_plusvalia, figura_renta, figura_abanico, figura_mapa_roi, figura_equilibrio, figura_tornado, figura_pareto
+from auditoria import Auditoria, COTIZACION, PDF
+from inventario import Inventario, ESTADOS, DISPONIBLE, APARTADO, VENDIDO
+from precarga import precargar
+from metricas import ARCHIVO_PROMETHEUS, iniciar_corrida, registrar, tramo, medido, contar, resumen, contadores, medidor, prometheus, escribir_prometheus
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Ananda Kino | Preventa", page_icon="💎", layout="wide")
 
+# --- PERFILADO (?profile=1 muestra los tiempos en la barra lateral; &pstats=1 además guarda un cProfile) ---
+perfil = st.query_params.get("profile") == "1"
+tiempos_corrida = iniciar_corrida()
+inicio_corrida = time.perf_counter()
+profiler = cProfile.Profile() if perfil and st.query_params.get("pstats") == "1" else None
+if profiler: profiler.enable()
+
 # --- ESTILOS VISUALES ---
 st.markdown("""
     <style>
@@ -71,62 +88,86 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# --- MATRIZ DE DESCUENTOS ---
-TABLA_DESCUENTOS = {
-    0: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
-    1: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
-    2: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
-    3: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
-    4: {95: 0.100, 90: 0.090, 80: 0.080, 70: 0.070, 60: 0.060, 50: 0.050, 40: 0.040, 30: 0.030, 25: 0.020, 20: 0.015, 15: 0.010},
-    5: {95: 0.095, 90: 0.085, 80: 0.075, 70: 0.065, 60: 0.055, 50: 0.045, 40: 0.035, 30: 0.025, 25: 0.015, 20: 0.010, 15: 0.005},
-    6: {95: 0.090, 90: 0.080, 80: 0.070, 70: 0.060, 60: 0.050, 50: 0.040, 40: 0.030, 30: 0.020, 25: 0.010, 20: 0.005},
-    7: {95: 0.085, 90: 0.075, 80: 0.065, 70: 0.055, 60: 0.045, 50: 0.035, 40: 0.025, 30: 0.015, 25: 0.005},
-    8: {95: 0.080, 90: 0.070, 80: 0.060, 70: 0.050, 60: 0.040, 50: 0.030, 40: 0.020, 30: 0.010},
-    9: {95: 0.075, 90: 0.065, 80: 0.055, 70: 0.045, 60: 0.035, 50: 0.025, 40: 0.015, 30: 0.005},
-    10: {95: 0.070, 90: 0.060, 80: 0.050, 70: 0.040, 60: 0.030, 50: 0.020, 40: 0.010},
-    11: {95: 0.0675, 90: 0.0575, 80: 0.0475, 70: 0.0375, 60: 0.0275, 50: 0.0175, 40: 0.0075},
-    12: {95: 0.065, 90: 0.055, 80: 0.045, 70: 0.035, 60: 0.025, 50: 0.015, 40: 0.005},
-    13: {95: 0.0625, 90: 0.0525, 80: 0.0425, 70: 0.0325, 60: 0.0225, 50: 0.0125, 40: 0.0025},
-}
-
-def obtener_descuento(plazo, enganche):
-    if plazo not in TABLA_DESCUENTOS: return 0.0
-    niveles = sorted(TABLA_DESCUENTOS[plazo].keys(), reverse=True)
-    for n in niveles:
-        if enganche >= n: return TABLA_DESCUENTOS[plazo][n]
-    return 0.0
-
-def clean_currency(val):
-    if pd.isna(val): return 0.0
-    s = str(val).replace('$', '').replace(',', '').replace(' ', '')
-    try: return float(s)
-    except: return 0.0
-
-@st.cache_data
-def load_data():
-    file_name = "precios.csv"
-    try:
-        df = pd.read_csv(file_name)
-        cols_str = "".join([str(c).lower() for c in df.columns])
-        if "lote" not in cols_str: df = pd.read_csv(file_name, header=1)
-        df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_').str.replace('.', '').str.replace('(', '').str.replace(')', '')
-        col_lote = next((c for c in df.columns if 'lote' in c or 'unidad' in c), None)
-        if col_lote:
-            df.rename(columns={col_lote: 'lote'}, inplace=True)
-            df['lote'] = pd.to_numeric(df['lote'], errors='coerce')
-            df = df.dropna(subset=['lote'])
-            df['lote'] = df['lote'].astype(int)
-            df = df[(df['lote'] >= 1) & (df['lote'] <= 44)]
-            df = df.sort_values('lote')
-            col_status = next((c for c in df.columns if 'cliente' in c or 'estatus' in c), None)
-            df['status'] = df[col_status].apply(lambda x: 'Vendido' if pd.notnull(x) and str(x).strip() not in ['', 'nan'] else 'Disponible') if col_status else 'Disponible'
-            df.loc[(df['lote'] >= 11) & (df['lote'] <= 22), 'status'] = 'Vendido'
-            return df
-        return None
-    except: return None
-
-df_raw = load_data()
-if df_raw is None: df_raw = pd.DataFrame({'lote': range(1, 45), 'status': ['Disponible']*44})
+# La hoja sólo se lee para construir el catálogo y sembrar el inventario (una vez por proceso);
+# el snapshot en disco de `leer_precios` ya evita volver a parsear el CSV.
+def load_data(ruta=ARCHIVO_PRECIOS):
+    contar("hoja_cargas")
+    try: return leer_precios(ruta)
+    except (OSError, ValueError): return None
+
+def hoja_o_default(ruta):
+    df = load_data(ruta)
+    return inventario_default() if df is None else df
+
+def solo_lectura(arr):
+    arr.flags.writeable = False
+    return arr
+
+def flotante_compacto(arr):
+    # float32 sólo si no pierde nada (precios enteros); si no, se quedan en float64
+    arr32 = arr.astype(np.float32)
+    return arr32 if np.array_equal(arr32, arr) else arr
+
+@st.cache_resource(max_entries=16)
+def catalogo(ruta):
+    """Arreglos del desarrollo compartidos por todas las sesiones del proceso (sin copias, de sólo lectura)."""
+    df = hoja_o_default(ruta)
+    lotes = df['lote'].to_numpy()
+    if len(lotes) == 0:
+        raise ValueError(f"La hoja de precios no tiene lotes: {ruta}")
+    lotes = lotes.astype(np.int16 if lotes.max() <= np.iinfo(np.int16).max else np.int32)
+    m2_terrenos, m2_construcciones = superficies(df)
+    orden = np.argsort(lotes, kind='stable').astype(np.int32)
+    cat = {
+        "lotes": lotes,
+        "lotes_str": lotes.astype(str),
+        "etiquetas": np.char.add("Lote ", lotes.astype(str)),
+        # Búsqueda de la fila de un lote: searchsorted sobre los números ordenados
+        "orden": orden,
+        "lotes_ordenados": lotes[orden],
+        "precios_lista": flotante_compacto(matriz_precios(df)),
+        "m2_terrenos": flotante_compacto(m2_terrenos),
+        "m2_construcciones": flotante_compacto(m2_construcciones),
+    }
+    return {k: solo_lectura(v) for k, v in cat.items()}
+
+def fila_lote(cat, lote):
+    return int(cat["orden"][np.searchsorted(cat["lotes_ordenados"], lote)])
+
+ESTADOS_ARR = solo_lectura(np.array(ESTADOS))
+CODIGO_ESTADO = {e: i for i, e in enumerate(ESTADOS)}
+
+@st.cache_resource
+def get_inventario():
+    # Un inventario por proceso; las hojas sólo siembran los lotes que aún no existen en la base
+    inv = Inventario()
+    for nombre, ruta in desarrollos().items():
+        df = hoja_o_default(ruta)
+        inv.sembrar(nombre, df['lote'], df['status'])
+    return inv
+
+inventario = get_inventario()
+
+@st.cache_resource
+def get_auditoria():
+    # Una bitácora por proceso: todas las sesiones encolan en el mismo escritor de fondo
+    bitacora = Auditoria()
+    medidor("auditoria_pendientes", bitacora.pendientes)
+    return bitacora
+
+auditoria = get_auditoria()
+
+@st.cache_resource(max_entries=32)
+def codigos_status(ruta, desarrollo, version):
+    """Estatus de cada lote del catálogo como índice en ESTADOS (int8), compartido mientras no cambie la versión."""
+    estados = pd.Series(catalogo(ruta)["lotes"]).map(inventario.estados(desarrollo)).fillna(DISPONIBLE)
+    return solo_lectura(estados.map(CODIGO_ESTADO).to_numpy(dtype=np.int8))
+
+@st.fragment(run_every="5s")
+def vigilar_inventario():
+    # Si otra sesión apartó o vendió un lote, se vuelve a pintar la página con el estado nuevo
+    if inventario.version() != st.session_state.get("version_inventario"):
+        st.rerun(scope="app")
 
 # ==============================================================================
 # 🟦 BARRA LATERAL (CONFIGURACIÓN)
@@ -140,43 +181,100 @@ asesor_nombre = st.sidebar.text_input("Asesor:", value="")
 
 st.sidebar.markdown("---")
 st.sidebar.header("1. Propiedad")
-lista_seleccionada = st.sidebar.selectbox("Lista de Precio:", range(1, 11), index=0)
-opciones_lotes = df_raw.apply(lambda x: f"Lote {x['lote']} ({x['status']})", axis=1).tolist()
-lote_str_selec = st.sidebar.selectbox("Lote:", opciones_lotes)
-num_lote_selec = int(lote_str_selec.split(' ')[1])
+hojas_desarrollos = desarrollos()
+desarrollo = st.sidebar.selectbox("Desarrollo:", list(hojas_desarrollos)) if len(hojas_desarrollos) > 1 else DESARROLLO_DEFAULT
+with tramo("carga"):
+    cat = catalogo(hojas_desarrollos[desarrollo])
+precios_lista, lotes = cat["precios_lista"], cat["lotes"]
+
+with tramo("inventario"):
+    version_inventario = inventario.version()
+    st.session_state["version_inventario"] = version_inventario
+    codigos_lotes = codigos_status(hojas_desarrollos[desarrollo], desarrollo, version_inventario)
+
+# Los controles de la cotización tienen llave para que el optimizador (sección 6) pueda aplicar un plan
+for llave, default in (("lista", 1), ("enganche_pct", 30), ("plazo_meses", 12)):
+    st.session_state.setdefault(llave, default)
+lista_seleccionada = st.sidebar.selectbox("Lista de Precio:", range(1, NUM_LISTAS + 1), key="lista")
+
+# Filtros del selector: todo se evalúa como máscaras sobre los arreglos del catálogo
+filtro = np.ones(len(lotes), dtype=bool)
+with st.sidebar.expander("🔎 Buscar / filtrar lotes"):
+    f_status = st.multiselect("Estatus:", ESTADOS, default=list(ESTADOS), key=f"f_status_{desarrollo}")
+    filtro &= np.isin(codigos_lotes, [CODIGO_ESTADO[e] for e in f_status])
+    buscar = st.text_input("Número de lote:", key=f"f_buscar_{desarrollo}").strip()
+    if buscar: filtro &= np.char.find(cat["lotes_str"], buscar) >= 0
+    m2_min, m2_max = float(cat["m2_construcciones"].min()), float(cat["m2_construcciones"].max())
+    if m2_min < m2_max:
+        r_m2 = st.slider("M² construcción:", m2_min, m2_max, (m2_min, m2_max), key=f"f_m2_{desarrollo}")
+        filtro &= (cat["m2_construcciones"] >= r_m2[0]) & (cat["m2_construcciones"] <= r_m2[1])
+    precios_sel = precios_lista[:, lista_seleccionada - 1]
+    p_min, p_max = float(precios_sel.min()), float(precios_sel.max())
+    if p_min < p_max:
+        r_precio = st.slider(f"Precio Lista {lista_seleccionada}:", p_min, p_max, (p_min, p_max), step=10000.0, format="$%.0f", key=f"f_precio_{desarrollo}")
+        filtro &= (precios_sel >= r_precio[0]) & (precios_sel <= r_precio[1])
+
+if not filtro.any():
+    st.sidebar.warning("Ningún lote coincide con los filtros.")
+    st.stop()
+etiquetas = dict(zip(lotes[filtro].tolist(), np.char.add(np.char.add(cat["etiquetas"][filtro], " ("), np.char.add(ESTADOS_ARR[codigos_lotes[filtro]], ")")).tolist()))
+num_lote_selec = st.sidebar.selectbox("Lote:", list(etiquetas), format_func=etiquetas.get, key=f"lote_{desarrollo}")
+
+with tramo("lote"):
+    info_lote = inventario.lote(desarrollo, num_lote_selec) or {'status': DISPONIBLE, 'asesor': ''}
+status_lote = info_lote['status']
+if status_lote == DISPONIBLE:
+    if st.sidebar.button("🔒 Apartar lote", disabled=not asesor_nombre, help="Captura el asesor para apartar"):
+        if inventario.reservar(desarrollo, num_lote_selec, asesor_nombre, cliente_nombre): st.rerun()
+        st.sidebar.error("Otro asesor acaba de apartar o vender este lote.")
+elif status_lote == APARTADO:
+    st.sidebar.warning(f"Apartado por {info_lote['asesor']}")
+    if asesor_nombre and info_lote['asesor'] == asesor_nombre:
+        b1, b2 = st.sidebar.columns(2)
+        if b1.button("✅ Vender"):
+            if inventario.vender(desarrollo, num_lote_selec, asesor_nombre, cliente_nombre): st.rerun()
+            st.sidebar.error("El lote cambió de estado; vuelve a intentarlo.")
+        if b2.button("↩️ Liberar"):
+            if inventario.liberar(desarrollo, num_lote_selec, asesor_nombre): st.rerun()
+            st.sidebar.error("El lote cambió de estado; vuelve a intentarlo.")
+vigilar_inventario()
 
 st.sidebar.header("2. Forma de Pago")
-enganche_pct = st.sidebar.select_slider("% Enganche:", options=[15, 20, 25, 30, 40, 50, 60, 70, 80, 90, 95], value=30)
-plazo_meses = st.sidebar.selectbox("Plazo Enganche (Meses):", [0] + list(range(1, 14)), index=12)
+enganche_pct = st.sidebar.select_slider("% Enganche:", options=list(OPCIONES_ENGANCHE), key="enganche_pct")
+plazo_meses = st.sidebar.selectbox("Plazo Enganche (Meses):", list(OPCIONES_PLAZO), key="plazo_meses")
 
 # === CÁLCULOS ===
-row_lote = df_raw[df_raw['lote'] == num_lote_selec].iloc[0]
-col_m2 = next((c for c in df_raw.columns if 'm2' in c and 'privativo' in c), None) or next((c for c in df_raw.columns if 'm2' in c), None)
-m2_terreno = clean_currency(row_lote.get(col_m2, 216.0)) if col_m2 else 216.0
-col_const = next((c for c in df_raw.columns if 'construccion' in c and 'total' in c), None)
-m2_construccion = clean_currency(row_lote.get(col_const, 128.8)) if col_const else 128.8
-
-col_precio_lista = next((c for c in df_raw.columns if f"lista_{lista_seleccionada}" in c), None)
-if col_precio_lista:
-    precio_lista_base = clean_currency(row_lote[col_precio_lista])
-else:
-    col_l1 = next((c for c in df_raw.columns if 'lista_1' in c), None)
-    base = clean_currency(row_lote[col_l1]) if col_l1 else 3300000.0
-    precio_lista_base = base * (1 + 0.03 * (lista_seleccionada - 1))
-
-# --- CAMBIO SOLICITADO: FIJAR PRECIO FINAL A LA ENTREGA EN 4,300,000 ---
-precio_futuro_lista10 = 4300000.0
+with tramo("lote"):
+    idx_lote = fila_lote(cat, num_lote_selec)
+    m2_terreno = float(cat["m2_terrenos"][idx_lote])
+    m2_construccion = float(cat["m2_construcciones"][idx_lote])
+
+# Precio final a la entrega fijo por desarrollo (None si el desarrollo no lo tiene)
+precio_futuro_lista10 = PRECIOS_FUTUROS.get(desarrollo)
+
+with tramo("cotizacion"):
+    cot = cotizar(precios_lista, idx_lote, lista_seleccionada, enganche_pct, plazo_meses, precio_futuro_lista10)
+precio_lista_base = float(cot["precio_lista_base"])
 
 # Financiero
-descuento_pct = obtener_descuento(plazo_meses, enganche_pct)
-monto_descuento = precio_lista_base * descuento_pct
-precio_final_venta = precio_lista_base - monto_descuento
-plusvalia_preventa = precio_futuro_lista10 - precio_final_venta
+descuento_pct = float(cot["descuento_pct"])
+monto_descuento = float(cot["monto_descuento"])
+precio_final_venta = float(cot["precio_final_venta"])
+plusvalia_preventa = None if precio_futuro_lista10 is None else float(cot["plusvalia_preventa"])
 
 # Pagos
-monto_enganche = precio_final_venta * (enganche_pct / 100.0)
-saldo_final = precio_final_venta - monto_enganche
-mensualidad = monto_enganche / plazo_meses if plazo_meses > 0 else 0
+monto_enganche = float(cot["monto_enganche"])
+saldo_final = float(cot["saldo_final"])
+mensualidad = float(cot["mensualidad"])
+
+# Auditoría: se encola (sin esperar al disco) sólo cuando cambia la cotización de la sesión
+registro_auditoria = dict(
+    desarrollo=desarrollo, lote=int(num_lote_selec), lista=lista_seleccionada, enganche_pct=enganche_pct, plazo_meses=plazo_meses,
+    cliente=cliente_nombre, asesor=asesor_nombre, precio_final=precio_final_venta, monto_enganche=monto_enganche,
+    mensualidad=mensualidad, sesion=st.session_state.setdefault("sesion_auditoria", uuid.uuid4().hex[:12]))
+if st.session_state.get("ultima_auditada") != registro_auditoria:
+    st.session_state["ultima_auditada"] = registro_auditoria
+    auditoria.registrar(COTIZACION, **registro_auditoria)
 
 st.sidebar.info(f"📋 **Lote {num_lote_selec}:** {m2_terreno:.0f}m² T | {m2_construccion:.0f}m² C")
 
@@ -184,10 +282,13 @@ st.sidebar.info(f"📋 **Lote {num_lote_selec}:** {m2_terreno:.0f}m² T | {m2_co
 # 📄 CUERPO PRINCIPAL
 # ==============================================================================
 st.title(f"💎 PREVENTA Ananda | Lote {num_lote_selec}")
-if "Vendido" in lote_str_selec: st.error("⛔ ESTE LOTE YA ESTÁ VENDIDO")
+if status_lote == VENDIDO: st.error("⛔ ESTE LOTE YA ESTÁ VENDIDO")
+elif status_lote == APARTADO: st.warning(f"⏳ ESTE LOTE ESTÁ APARTADO POR {info_lote['asesor'].upper()}")
 
 # --- SECCIÓN 1: ESPECIFICACIONES ---
-st.markdown('<div class="section-title">1. 44 casas en Bahía Kino</div>', unsafe_allow_html=True)
+inicio_seccion_1 = time.perf_counter()
+titulo_desarrollo = f"{len(lotes)} casas en Bahía Kino" if desarrollo == DESARROLLO_DEFAULT else f"{len(lotes)} unidades en {desarrollo}"
+st.markdown(f'<div class="section-title">1. {titulo_desarrollo}</div>', unsafe_allow_html=True)
 st.markdown("""
 <div style="background:#fff; padding:15px; border-radius:10px; border:1px solid #eee; box-shadow:0 2px 5px rgba(0,0,0,0.05);">
 <ul style="list-style:none; padding:0; display:flex; flex-wrap:wrap; gap:12px; justify-content:center; margin:0;">
@@ -201,321 +302,295 @@ st.markdown("""
 </ul>
 </div>
 """, unsafe_allow_html=True)
+registrar("seccion_1", time.perf_counter() - inicio_seccion_1)
+
+# --- PROYECCIÓN (datos compartidos por las secciones 3 a 5 y el PDF) ---
+# Sin precio a la entrega la proyección arranca del precio final de la cotización
+valor_proyeccion = precio_final_venta if precio_futuro_lista10 is None else precio_futuro_lista10
+with tramo("proyeccion"):
+    data_proy = proyectar_plusvalia(valor_proyeccion)
+valor_final_5y = data_proy[-1]['Valor Propiedad']
+neto_bolsillo_est = data_proy[1]['Renta Acumulada'] # Primer año de renta completo
+roi_renta = (neto_bolsillo_est / precio_final_venta) * 100
+
+# Cifras del PDF. El simulador de rentas actualiza 'roi_renta' en este mismo dict cuando se
+# re-ejecuta solo, así la descarga diferida siempre usa el último ROI que vio el cliente.
+cotizacion_pdf = dict(
+    cliente_nombre=cliente_nombre, asesor_nombre=asesor_nombre, num_lote_selec=num_lote_selec, m2_terreno=m2_terreno,
+    precio_lista_base=precio_lista_base, descuento_pct=descuento_pct, monto_descuento=monto_descuento,
+    precio_final_venta=precio_final_venta, precio_futuro_lista10=precio_futuro_lista10, enganche_pct=enganche_pct,
+    monto_enganche=monto_enganche, plazo_meses=plazo_meses, mensualidad=mensualidad, saldo_final=saldo_final,
+    plusvalia_preventa=plusvalia_preventa, valor_final_5y=valor_final_5y, neto_bolsillo_est=neto_bolsillo_est,
+    roi_renta=roi_renta, credito=None,  # seccion_plan lo llena si se financia la liquidación final
+)
+
+# Cada sección es un fragmento: sus propios widgets sólo vuelven a ejecutar esa sección.
+# Los controles de la barra lateral cambian la cotización completa y sí repintan todo.
+
+def descargar_pdf(cotizacion_pdf, registro):
+    # Corre hasta que se pulsa el botón (descarga diferida): ahí se audita la descarga
+    auditoria.registrar(PDF, **registro)
+    return pdf_cotizacion(cotizacion_pdf)
 
 # --- SECCIÓN 2: MERCADO & PRECIO ---
-st.markdown('<div class="section-title">2. Ananda vs El Mercado</div>', unsafe_allow_html=True)
-
-# BLOQUE DE PRECIO (4 COLUMNAS)
-c1, c2, c3, c4 = st.columns(4)
-with c1: st.markdown(f"""<div class="fin-card"><div class="fin-label">Precio de Lista</div><div class="fin-val">${precio_lista_base:,.0f}</div></div>""", unsafe_allow_html=True)
-with c2: st.markdown(f"""<div class="fin-card"><div class="fin-label">Tu Descuento ({descuento_pct*100:.1f}%)</div><div class="fin-discount">-${monto_descuento:,.0f}</div></div>""", unsafe_allow_html=True)
-with c3: st.markdown(f"""<div class="fin-card" style="border: 2px solid #28a745; background:#f0fff4"><div class="fin-label">PRECIO FINAL</div><div class="fin-final">${precio_final_venta:,.0f}</div></div>""", unsafe_allow_html=True)
-with c4: st.markdown(f"""<div class="fin-card" style="background:#fffcf2"><div class="fin-label">PRECIO FINAL A LA ENTREGA DE TODO EL PROYECTO</div><div class="fin-future">${precio_futuro_lista10:,.0f}</div></div>""", unsafe_allow_html=True)
-
-st.write("")
-
-precio_m2_ananda = precio_final_venta / m2_construccion if m2_construccion > 0 else 0
-data_comp = [
-    {"Proyecto": "ANANDA", "Precio": precio_final_venta, "M2": m2_construccion, "Tipo": "Casa", "PrecioM2": precio_m2_ananda},
-    {"Proyecto": "Punta Península", "Precio": 4850000, "M2": 100, "Tipo": "Depto", "PrecioM2": 48500},
-    {"Proyecto": "HAX", "Precio": 3600000, "M2": 70, "Tipo": "Depto", "PrecioM2": 51428},
-    {"Proyecto": "Azaluma", "Precio": 4100000, "M2": 85, "Tipo": "Depto", "PrecioM2": 48235}
-]
-df_comp = pd.DataFrame(data_comp)
-
-col_comp_1, col_comp_2 = st.columns([1, 1])
-with col_comp_1:
-    st.markdown(f"#### 🏷️ Tu Precio M²: **${precio_m2_ananda:,.0f}**")
-    st.markdown("""
-    <table class="comp-table feature-table">
-        <tr><th>Ventajas Competitivas</th></tr>
-        <tr><td><span class='check'>✔</span> Precio por M² más bajo</td></tr>
-        <tr><td><span class='check'>✔</span> Privacidad (Sin vecinos arriba/abajo)</td></tr>
-        <tr><td><span class='check'>✔</span> Cochera Doble</td></tr>
-        <tr><td><span class='check'>✔</span> Mantenimiento Bajo</td></tr>
-        <tr><td><span class='check'>✔</span> Dueño de Tierra + Casa</td></tr>
-    </table>
-    """, unsafe_allow_html=True)
-with col_comp_2:
-    fig_bar = go.Figure(go.Bar(
-        x=df_comp.sort_values('PrecioM2')['Proyecto'], 
-        y=df_comp.sort_values('PrecioM2')['PrecioM2'],
-        marker_color=['#28a745' if 'ANANDA' in p else '#ef553b' for p in df_comp.sort_values('PrecioM2')['Proyecto']],
-        text=[f"${x:,.0f}" for x in df_comp.sort_values('PrecioM2')['PrecioM2']],
-        textposition='auto'
-    ))
-    fig_bar.update_layout(height=250, margin=dict(t=10,b=10), yaxis_title="$/m2")
-    st.plotly_chart(fig_bar, use_container_width=True)
+@st.fragment
+@medido("seccion_2")
+def seccion_mercado(precio_lista_base, descuento_pct, monto_descuento, precio_final_venta, precio_futuro_lista10, m2_construccion):
+    st.markdown('<div class="section-title">2. Ananda vs El Mercado</div>', unsafe_allow_html=True)
+
+    # BLOQUE DE PRECIO (4 COLUMNAS)
+    c1, c2, c3, c4 = st.columns(4) if precio_futuro_lista10 is not None else (*st.columns(3), None)
+    with c1: st.markdown(f"""<div class="fin-card"><div class="fin-label">Precio de Lista</div><div class="fin-val">${precio_lista_base:,.0f}</div></div>""", unsafe_allow_html=True)
+    with c2: st.markdown(f"""<div class="fin-card"><div class="fin-label">Tu Descuento ({descuento_pct*100:.1f}%)</div><div class="fin-discount">-${monto_descuento:,.0f}</div></div>""", unsafe_allow_html=True)
+    with c3: st.markdown(f"""<div class="fin-card" style="border: 2px solid #28a745; background:#f0fff4"><div class="fin-label">PRECIO FINAL</div><div class="fin-final">${precio_final_venta:,.0f}</div></div>""", unsafe_allow_html=True)
+    if c4:
+        with c4: st.markdown(f"""<div class="fin-card" style="background:#fffcf2"><div class="fin-label">PRECIO FINAL A LA ENTREGA DE TODO EL PROYECTO</div><div class="fin-future">${precio_futuro_lista10:,.0f}</div></div>""", unsafe_allow_html=True)
+
+    st.write("")
+
+    precio_m2_ananda = precio_final_venta / m2_construccion if m2_construccion > 0 else 0
+
+    col_comp_1, col_comp_2 = st.columns([1, 1])
+    with col_comp_1:
+        st.markdown(f"#### 🏷️ Tu Precio M²: **${precio_m2_ananda:,.0f}**")
+        st.markdown("""
+        <table class="comp-table feature-table">
+            <tr><th>Ventajas Competitivas</th></tr>
+            <tr><td><span class='check'>✔</span> Precio por M² más bajo</td></tr>
+            <tr><td><span class='check'>✔</span> Privacidad (Sin vecinos arriba/abajo)</td></tr>
+            <tr><td><span class='check'>✔</span> Cochera Doble</td></tr>
+            <tr><td><span class='check'>✔</span> Mantenimiento Bajo</td></tr>
+            <tr><td><span class='check'>✔</span> Dueño de Tierra + Casa</td></tr>
+        </table>
+        """, unsafe_allow_html=True)
+    with col_comp_2:
+        fig_bar = figura_mercado(precio_final_venta, m2_construccion)
+        st.plotly_chart(fig_bar, use_container_width=True)
 
 # --- SECCIÓN 3: PLUSVALÍA ---
-st.markdown('<div class="section-title">3. Proyección de Plusvalía</div>', unsafe_allow_html=True)
-
-tarifa_base = 4500
-ocupacion_base = 0.45
-inflacion = 0.05
-plusvalia_anual = 0.08
-years = range(2027, 2033)
-
-data_proy = []
-val_prop = precio_futuro_lista10 
-acum_rentas = 0
-
-for i, y in enumerate(years):
-    t_act = tarifa_base * ((1+inflacion)**i)
-    neto_anual_est = (t_act * 365 * ocupacion_base) * 0.70
-    if y > 2027:
-        acum_rentas += neto_anual_est
-    data_proy.append({
-        "Año": y, 
-        "Valor Propiedad": val_prop, 
-        "Renta Acumulada": acum_rentas,
-        "Total Patrimonio": val_prop + acum_rentas
-    })
-    val_prop *= (1 + plusvalia_anual)
-
-df_proy = pd.DataFrame(data_proy)
-valor_final_5y = df_proy.iloc[-1]['Valor Propiedad']
-neto_bolsillo_est = data_proy[1]['Renta Acumulada'] # Primer año de renta completo
-roi_renta = (neto_bolsillo_est / precio_final_venta) * 100
-
-col_plus_1, col_plus_2 = st.columns([2, 1])
-with col_plus_1:
-    fig_area = px.area(df_proy, x="Año", y=["Valor Propiedad", "Renta Acumulada"], 
-                      title="Crecimiento Total (Valor Casa + Rentas)",
-                      color_discrete_map={"Valor Propiedad":"#004e92", "Renta Acumulada":"#28a745"})
-    fig_area.update_layout(plot_bgcolor='rgba(0,0,0,0)', legend_title_text='')
-    st.plotly_chart(fig_area, use_container_width=True)
-with col_plus_2:
-    st.markdown(f"""
-    <div class="fin-card" style="margin-bottom:15px;">
-        <div class="fin-label">Plusvalía a la Entrega (2027)</div>
-        <div class="fin-val" style="color:#28a745">+${plusvalia_preventa:,.0f}</div>
-        <small>Ganancia vs Lista 10</small>
-    </div>
-    <div class="fin-card" style="background:#f9f9f9;">
-        <div class="fin-label">Valor Propiedad (2032)</div>
-        <div class="fin-val">${valor_final_5y:,.0f}</div>
-        <small>Proyección 5 Años</small>
-    </div>
-    """, unsafe_allow_html=True)
+@st.fragment
+@medido("seccion_3")
+def seccion_plusvalia(valor_inicial, plusvalia_preventa, valor_final_5y):
+    st.markdown('<div class="section-title">3. Proyección de Plusvalía</div>', unsafe_allow_html=True)
+
+    escenarios = st.toggle("📉 Escenarios (Monte Carlo, 100 mil trayectorias)", help="Bandas P10/P50/P90 de plusvalía, inflación, tarifa y ocupación")
+
+    col_plus_1, col_plus_2 = st.columns([2, 1])
+    with col_plus_1:
+        fig_area = figura_abanico(valor_inicial) if escenarios else figura_plusvalia(valor_inicial)
+        st.plotly_chart(fig_area, use_container_width=True)
+    with col_plus_2:
+        if plusvalia_preventa is not None:
+            st.markdown(f"""
+            <div class="fin-card" style="margin-bottom:15px;">
+                <div class="fin-label">Plusvalía a la Entrega (2027)</div>
+                <div class="fin-val" style="color:#28a745">+${plusvalia_preventa:,.0f}</div>
+                <small>Ganancia vs Lista 10</small>
+            </div>
+            """, unsafe_allow_html=True)
+        if escenarios:
+            p10, p50, p90 = bandas_montecarlo(valor_inicial)["Valor Propiedad"][:, -1]
+            st.markdown(f"""
+            <div class="fin-card" style="background:#f9f9f9;">
+                <div class="fin-label">Valor Propiedad (2032)</div>
+                <div class="fin-val">${p50:,.0f}</div>
+                <small>Pesimista (P10) ${p10:,.0f} · Optimista (P90) ${p90:,.0f}</small>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown(f"""
+            <div class="fin-card" style="background:#f9f9f9;">
+                <div class="fin-label">Valor Propiedad (2032)</div>
+                <div class="fin-val">${valor_final_5y:,.0f}</div>
+                <small>Proyección 5 Años</small>
+            </div>
+            """, unsafe_allow_html=True)
 
 # --- SECCIÓN 4: RENTAS ---
-st.markdown('<div class="section-title">4. Simulador de Negocio (Rentas)</div>', unsafe_allow_html=True)
-
-c4a, c4b = st.columns([1, 2])
-with c4a:
-    st.markdown("##### Variables")
-    tarifa = st.number_input("Tarifa Noche ($):", value=4500, step=500)
-    ocupacion = st.slider("Ocupación Anual %:", 20, 80, 45) / 100
-    st.markdown("##### Gastos")
-    admin_pct = st.slider("Comisión Administración %:", 15, 30, 25) / 100
-    gastos_fijos = st.number_input("Gastos Fijos Mensuales (Luz/Net) $:", value=3000, step=500)
-
-with c4b:
-    ingreso_bruto = tarifa * 365 * ocupacion
-    gasto_admin = ingreso_bruto * admin_pct
-    gasto_servicios = gastos_fijos * 12
-    total_gastos = gasto_admin + gasto_servicios
-    neto_bolsillo = ingreso_bruto - total_gastos
-    roi_renta = (neto_bolsillo / precio_final_venta) * 100
-    
-    m1, m2, m3 = st.columns(3)
-    m1.metric("Ingreso Bruto", f"${ingreso_bruto:,.0f}")
-    m2.metric("Total Gastos", f"-${total_gastos:,.0f}")
-    m3.metric("UTILIDAD NETA", f"${neto_bolsillo:,.0f}", delta=f"ROI {roi_renta:.1f}%")
-    
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=['Tu Ganancia', 'Comisión Admin', 'Servicios/Gastos'],
-        values=[neto_bolsillo, gasto_admin, gasto_servicios],
-        hole=.4,
-        marker_colors=['#28a745', '#ef553b', '#ffc107']
-    )])
-    fig_pie.update_layout(height=250, margin=dict(t=0,b=0,l=0,r=0))
-    st.plotly_chart(fig_pie, use_container_width=True)
+@st.fragment
+@medido("seccion_4")
+def seccion_rentas(precio_final_venta, cotizacion_pdf):
+    st.markdown('<div class="section-title">4. Simulador de Negocio (Rentas)</div>', unsafe_allow_html=True)
+
+    c4a, c4b = st.columns([1, 2])
+    with c4a:
+        st.markdown("##### Variables")
+        tarifa = st.number_input("Tarifa Noche ($):", value=TARIFA_DEFAULT, step=500)
+        ocupacion = st.slider("Ocupación Anual %:", 20, 80, int(OCUPACION_DEFAULT * 100)) / 100
+        st.markdown("##### Gastos")
+        admin_pct = st.slider("Comisión Administración %:", 15, 30, int(ADMIN_DEFAULT * 100)) / 100
+        gastos_fijos = st.number_input("Gastos Fijos Mensuales (Luz/Net) $:", value=GASTOS_FIJOS_DEFAULT, step=500)
+
+    with c4b:
+        renta = simular_renta(precio_final_venta, tarifa, ocupacion, admin_pct, gastos_fijos)
+        ingreso_bruto, gasto_admin, gasto_servicios = renta["ingreso_bruto"], renta["gasto_admin"], renta["gasto_servicios"]
+        total_gastos, neto_bolsillo, roi_renta = renta["total_gastos"], renta["neto_bolsillo"], renta["roi_renta"]
+        cotizacion_pdf["roi_renta"] = roi_renta
+        
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Ingreso Bruto", f"${ingreso_bruto:,.0f}")
+        m2.metric("Total Gastos", f"-${total_gastos:,.0f}")
+        m3.metric("UTILIDAD NETA", f"${neto_bolsillo:,.0f}", delta=f"ROI {roi_renta:.1f}%")
+        
+        fig_pie = figura_renta(neto_bolsillo, gasto_admin, gasto_servicios)
+        st.plotly_chart(fig_pie, use_container_width=True)
 
-# --- SECCIÓN 5: PLAN DE INVERSIÓN ---
-st.markdown('<div class="section-title">5. Plan de Inversión</div>', unsafe_allow_html=True)
+    if st.toggle("🔥 Análisis de sensibilidad", help="ROI y ocupación de equilibrio para todas las tarifas, ocupaciones y comisiones"):
+        s1, s2 = st.columns(2)
+        with s1: st.plotly_chart(figura_mapa_roi(precio_final_venta, gastos_fijos, admin_pct), use_container_width=True)
+        with s2: st.plotly_chart(figura_equilibrio(gastos_fijos), use_container_width=True)
+        st.plotly_chart(figura_tornado(precio_final_venta, tarifa, ocupacion, admin_pct, gastos_fijos), use_container_width=True)
 
-col_izq, col_der = st.columns([1, 1])
+# --- SECCIÓN 5: PLAN DE INVERSIÓN ---
+@st.fragment
+@medido("seccion_5")
+def seccion_plan(enganche_pct, monto_enganche, plazo_meses, mensualidad, saldo_final, cotizacion_pdf, fn):
+    st.markdown('<div class="section-title">5. Plan de Inversión</div>', unsafe_allow_html=True)
 
-with col_izq:
-    st.markdown(f"""
-        <div class="payment-card-blue">
-            <div class="pay-title">ENGANCHE TOTAL ({enganche_pct}%)</div>
-            <div class="pay-amount">${monto_enganche:,.2f}</div>
-            <div class="pay-sub">A pagar en {plazo_meses} meses</div>
-        </div>
-    """, unsafe_allow_html=True)
+    col_izq, col_der = st.columns([1, 1])
 
-with col_der:
-    st.markdown(f"""
-        <div class="payment-card-dark">
-            <div class="pay-title">LIQUIDACIÓN FINAL</div>
-            <div class="pay-amount-dark">${saldo_final:,.2f}</div>
-            <div class="pay-sub-dark">Contra Entrega (Verano 2027)</div>
-        </div>
-    """, unsafe_allow_html=True)
+    with col_izq:
+        st.markdown(f"""
+            <div class="payment-card-blue">
+                <div class="pay-title">ENGANCHE TOTAL ({enganche_pct}%)</div>
+                <div class="pay-amount">${monto_enganche:,.2f}</div>
+                <div class="pay-sub">A pagar en {plazo_meses} meses</div>
+            </div>
+        """, unsafe_allow_html=True)
 
-if plazo_meses > 0:
-    c_tabla, c_boton = st.columns([2, 1])
-    
-    with c_tabla:
-        st.markdown("### 📅 Desglose de Mensualidades")
-        # Generar HTML Limpio para la tabla
-        rows_html = ""
-        for i in range(1, plazo_meses + 1):
-            rows_html += f"<tr><td style='padding:12px; border-bottom:1px solid #eee;'>{i}</td><td style='padding:12px; border-bottom:1px solid #eee;'>Mensualidad Enganche</td><td style='text-align:right; font-weight:bold; padding:12px; border-bottom:1px solid #eee;'>${mensualidad:,.2f}</td></tr>"
-        
+    with col_der:
         st.markdown(f"""
-        <table style="width:100%; border-collapse: collapse; margin-top: 10px; border: 1px solid #e1e5e8; border-radius: 8px; overflow: hidden; font-family: sans-serif;">
-            <thead>
-                <tr style="background-color: #004e92; color: white;">
-                    <th style="padding: 12px; text-align: left;">#</th>
-                    <th style="padding: 12px; text-align: left;">Concepto</th>
-                    <th style="padding: 12px; text-align: right;">Monto</th>
-                </tr>
-            </thead>
-            <tbody>{rows_html}</tbody>
-        </table>
+            <div class="payment-card-dark">
+                <div class="pay-title">LIQUIDACIÓN FINAL</div>
+                <div class="pay-amount-dark">${saldo_final:,.2f}</div>
+                <div class="pay-sub-dark">Contra Entrega (Verano 2027)</div>
+            </div>
         """, unsafe_allow_html=True)
 
-# --- PDF GENERATOR (ACTUALIZADO) ---
-class PDF(FPDF):
-    def header(self):
-        # LOGO GRANDE (60 de ancho)
-        try: self.image('logo.png', 10, 8, 60)
-        except: pass
-        
-        self.set_y(15)
-        self.set_font('Arial', 'B', 16)
-        self.set_text_color(0, 78, 146)
-        self.cell(0, 10, 'COTIZACION PREVENTA ANANDA', 0, 1, 'R')
-        
-        # WEB
-        self.set_font('Arial', '', 10)
-        self.set_text_color(100)
-        self.cell(0, 5, 'www.anandakino.mx', 0, 1, 'R', link='https://www.anandakino.mx')
-        self.ln(15)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(128)
-        self.cell(0, 10, f'Ananda Kino | {date.today().strftime("%d/%m/%Y")} | Pagina {self.page_no()}', 0, 0, 'C')
-
-def create_pdf():
-    pdf = PDF()
-    pdf.set_auto_page_break(auto=True, margin=10)
-    pdf.add_page()
-    
-    # 1. HEADER
-    pdf.set_font('Arial', '', 11)
-    pdf.set_text_color(50)
-    pdf.cell(100, 6, f'Cliente: {cliente_nombre if cliente_nombre else "_________________"}', 0, 0)
-    pdf.cell(0, 6, f'Fecha: {date.today().strftime("%d/%m/%Y")}', 0, 1, 'R')
-    pdf.cell(100, 6, f'Asesor: {asesor_nombre if asesor_nombre else "_________________"}', 0, 0)
-    pdf.set_font('Arial', 'B', 11)
-    pdf.set_text_color(0, 78, 146)
-    pdf.cell(0, 6, f'LOTE {num_lote_selec} ({m2_terreno:.0f}m2)', 0, 1, 'R')
-    pdf.ln(5)
-
-    # 2. BLOQUE AZUL: DATOS FINANCIEROS
-    pdf.set_fill_color(240, 248, 255) # Azul muy claro
-    pdf.rect(10, pdf.get_y(), 190, 40, 'F')
-    pdf.set_y(pdf.get_y() + 5)
-    
-    pdf.set_font('Arial', '', 11)
-    pdf.set_text_color(0)
-    pdf.cell(100, 7, 'Precio de Lista:', 0, 0, 'L')
-    pdf.cell(80, 7, f"${precio_lista_base:,.2f}", 0, 1, 'R')
-    
-    pdf.set_text_color(220, 53, 69)
-    pdf.cell(100, 7, f'Descuento ({descuento_pct*100:.1f}%):', 0, 0, 'L')
-    pdf.cell(80, 7, f"-${monto_descuento:,.2f}", 0, 1, 'R')
-    
-    pdf.set_text_color(0, 78, 146)
-    pdf.set_font('Arial', 'B', 14)
-    pdf.cell(100, 10, 'PRECIO FINAL:', 0, 0, 'L')
-    pdf.cell(80, 10, f"${precio_final_venta:,.2f}", 0, 1, 'R')
-    
-    pdf.set_text_color(0)
-    pdf.set_font('Arial', '', 10)
-    pdf.cell(100, 6, 'Precio a la Entrega (Lista 10):', 0, 0, 'L')
-    pdf.cell(80, 6, f"${precio_futuro_lista10:,.2f}", 0, 1, 'R')
-    pdf.ln(5)
-
-    # 3. PLAN DE PAGO
-    pdf.set_font('Arial', 'B', 12)
-    pdf.set_text_color(0)
-    pdf.cell(0, 10, 'PLAN DE INVERSION', 0, 1, 'L')
-    
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(100, 7, f'Enganche ({enganche_pct}%):', 0, 0)
-    pdf.cell(80, 7, f"${monto_enganche:,.2f}", 0, 1, 'R')
-    
     if plazo_meses > 0:
-        pdf.set_font('Arial', 'B', 11)
-        pdf.cell(100, 7, f'Mensualidad ({plazo_meses} pagos):', 0, 0)
-        pdf.cell(80, 7, f"${mensualidad:,.2f}", 0, 1, 'R')
-    
-    pdf.set_font('Arial', '', 11)
-    pdf.cell(100, 7, 'Saldo Final (Verano 2027):', 0, 0)
-    pdf.cell(80, 7, f"${saldo_final:,.2f}", 0, 1, 'R')
-    
-    # 4. TABLA DE AMORTIZACION
-    if plazo_meses > 0:
-        pdf.ln(10)
-        pdf.set_font('Arial', 'B', 11)
-        pdf.set_fill_color(0, 78, 146)
-        pdf.set_text_color(255)
-        pdf.cell(20, 8, '#', 1, 0, 'C', 1)
-        pdf.cell(110, 8, 'Concepto', 1, 0, 'C', 1)
-        pdf.cell(60, 8, 'Monto', 1, 1, 'C', 1)
+        c_tabla, c_boton = st.columns([2, 1])
         
-        pdf.set_font('Arial', '', 10)
-        pdf.set_text_color(0)
-        for i in range(1, plazo_meses + 1):
-            pdf.cell(20, 8, str(i), 1, 0, 'C')
-            pdf.cell(110, 8, 'Mensualidad Enganche', 1, 0, 'L')
-            pdf.cell(60, 8, f"${mensualidad:,.2f}", 1, 1, 'R')
-
-    # 5. LIQUIDACION
-    pdf.ln(10)
-    pdf.set_fill_color(44, 62, 80)
-    pdf.set_text_color(255)
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 12, f' LIQUIDACION FINAL: ${saldo_final:,.2f} (VERANO 2027)', 0, 1, 'C', 1)
-    
-    # 6. NEGOCIO & LEGAL
-    pdf.ln(8)
-    pdf.set_text_color(0, 78, 146)
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 8, 'PROYECCION DE NEGOCIO', 0, 1, 'L')
-    pdf.set_text_color(0)
-    pdf.set_font('Arial', '', 10)
-    pdf.cell(100, 6, "Plusvalia a la Entrega:", 0, 0)
-    pdf.set_text_color(40, 167, 69)
-    pdf.cell(80, 6, f"+${plusvalia_preventa:,.2f}", 0, 1, 'R')
-    pdf.set_text_color(0)
-    pdf.cell(100, 6, "Valor Proyectado (5 Anios):", 0, 0)
-    pdf.cell(80, 6, f"${valor_final_5y:,.2f}", 0, 1, 'R')
-    pdf.cell(100, 6, "Utilidad Renta Anual Estimada:", 0, 0)
-    pdf.cell(80, 6, f"${neto_bolsillo_est:,.2f} (ROI {roi_renta:.1f}%)", 0, 1, 'R')
-    
-    # Disclaimer
-    pdf.ln(5)
-    pdf.set_font('Arial', 'I', 8)
-    pdf.set_text_color(100)
-    pdf.multi_cell(0, 5, "Nota: Precios sujetos a cambios sin previo aviso. Las proyecciones son estimadas y no garantizan rendimientos futuros.", 0, 'C')
-
-    return pdf.output(dest='S').encode('latin-1', 'replace')
-
-# BOTÓN DE DESCARGA PDF EN COLUMNA DERECHA
-if plazo_meses > 0:
-    with c_boton:
-        st.markdown("<br><br><br>", unsafe_allow_html=True)
-        try:
-            pdf_bytes = create_pdf()
-            fn = f"Cotizacion_{cliente_nombre}_{num_lote_selec}.pdf"
-            st.download_button("📥 DESCARGAR PDF", pdf_bytes, file_name=fn, mime='application/pdf')
-        except: st.error("Error PDF")
\ No newline at end of file
+        with c_tabla:
+            st.markdown("### 📅 Desglose de Mensualidades")
+            # Generar HTML Limpio para la tabla
+            monto = f"${mensualidad:,.2f}"
+            rows_html = "".join(f"<tr><td style='padding:12px; border-bottom:1px solid #eee;'>{i}</td><td style='padding:12px; border-bottom:1px solid #eee;'>Mensualidad Enganche</td><td style='text-align:right; font-weight:bold; padding:12px; border-bottom:1px solid #eee;'>{monto}</td></tr>" for i in range(1, plazo_meses + 1))
+            
+            st.markdown(f"""
+            <table style="width:100%; border-collapse: collapse; margin-top: 10px; border: 1px solid #e1e5e8; border-radius: 8px; overflow: hidden; font-family: sans-serif;">
+                <thead>
+                    <tr style="background-color: #004e92; color: white;">
+                        <th style="padding: 12px; text-align: left;">#</th>
+                        <th style="padding: 12px; text-align: left;">Concepto</th>
+                        <th style="padding: 12px; text-align: right;">Monto</th>
+                    </tr>
+                </thead>
+                <tbody>{rows_html}</tbody>
+            </table>
+            """, unsafe_allow_html=True)
+
+        # BOTÓN DE DESCARGA PDF EN COLUMNA DERECHA
+        # El PDF se genera hasta que se pulsa el botón (descarga diferida) y queda en caché
+        with c_boton:
+            st.markdown("<br><br><br>", unsafe_allow_html=True)
+            st.download_button("📥 DESCARGAR PDF", lambda: descargar_pdf(cotizacion_pdf, registro_auditoria), file_name=fn, mime='application/pdf', on_click="ignore")
+
+    # FINANCIAMIENTO DE LA LIQUIDACIÓN (la tabla completa va al PDF)
+    cotizacion_pdf["credito"] = None
+    if saldo_final > 0 and st.toggle("🏦 Financiar la liquidación final", help="Crédito bancario o del desarrollador para el saldo contra entrega"):
+        f1, f2, f3, f4 = st.columns(4)
+        tasa = f1.number_input("Tasa anual %:", 0.0, 30.0, TASA_CREDITO_DEFAULT * 100, step=0.25) / 100
+        meses = f2.select_slider("Plazo (meses):", options=list(PLAZOS_CREDITO), value=PLAZO_CREDITO_DEFAULT)
+        esquema = f3.radio("Esquema:", ESQUEMAS, horizontal=True, help="Francés: pago fijo. Alemán: capital fijo, el pago baja cada mes.")
+        abono_anual = f4.number_input("Abono extra anual $:", 0, value=0, step=10000)
+        credito = (tasa, meses, esquema, float(abono_anual))
+        cotizacion_pdf["credito"] = credito
+        tabla = tabla_credito(saldo_final, credito)
+        res = resumen_credito(tabla)
+
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Primer Pago", f"${res['primer_pago']:,.2f}")
+        m2.metric("Último Pago", f"${res['ultimo_pago']:,.2f}")
+        m3.metric("Total Intereses", f"${res['total_intereses']:,.0f}")
+        m4.metric("Meses", res['meses'], delta=f"{res['meses'] - meses} con abonos" if res['meses'] < meses else None, delta_color="inverse")
+        # st.dataframe sólo dibuja las filas visibles: 360 pagos no cuestan más que 12
+        st.dataframe(pd.DataFrame(tabla), hide_index=True, use_container_width=True, height=320, column_config={
+            "mes": st.column_config.NumberColumn("#"),
+            **{col: st.column_config.NumberColumn(col.capitalize().replace("Interes", "Interés"), format="dollar") for col in ("pago", "interes", "capital", "abono", "saldo")},
+        })
+
+# --- SECCIÓN 6: OPTIMIZADOR DE PLAN ---
+CRITERIOS = {"precio": "Menor precio final", "descuento": "Mayor descuento", "desembolso": "Menor enganche"}
+
+def aplicar_plan(plan):
+    # Callback: corre antes del script, cuando todavía se puede escribir el estado de los controles
+    lote, lista, enganche, plazo = plan
+    st.session_state[f"lote_{desarrollo}"] = lote
+    st.session_state.update(lista=lista, enganche_pct=enganche, plazo_meses=plazo)
+
+@st.fragment
+@medido("seccion_6")
+def seccion_optimizador(idx_lote, precio_final_venta, monto_enganche, mensualidad):
+    if not st.toggle("🎯 Buscar el mejor plan para el presupuesto del cliente"):
+        return
+    st.markdown('<div class="section-title">6. Optimizador de Plan</div>', unsafe_allow_html=True)
+    o1, o2, o3, o4 = st.columns(4)
+    mensualidad_max = o1.number_input("Mensualidad máxima $:", 0, value=int(round(mensualidad, -3)) or 100000, step=5000)
+    enganche_max = o2.number_input("Enganche máximo $:", 0, value=int(round(monto_enganche, -3)), step=50000)
+    criterio = o3.radio("Criterio:", list(CRITERIOS), format_func=CRITERIOS.get)
+    todos = o4.radio("Lotes:", ("Este lote", "Disponibles del filtro")) != "Este lote"
+    # Todas las listas × enganches × plazos (y lotes) se evalúan de una vez
+    lotes_idx = np.flatnonzero(filtro & (codigos_lotes == CODIGO_ESTADO[DISPONIBLE])) if todos else [idx_lote]
+    res = optimizar_planes(precios_lista, mensualidad_max, enganche_max, criterio, lotes_idx)
+    if not res["validos"]:
+        st.warning("Ningún plan cabe en ese presupuesto.")
+        return
+    rk = res["ranking"]
+    ranking = pd.DataFrame({
+        "Lote": lotes[rk["lote_idx"]], "Lista": rk["lista"], "Enganche %": rk["enganche"].astype(int), "Plazo": rk["plazo"],
+        "Descuento": rk["descuento_pct"] * 100, "Precio final": rk["precio_final_venta"],
+        "Enganche $": rk["monto_enganche"], "Mensualidad": rk["mensualidad"],
+    })
+    c_tabla, c_fig = st.columns([3, 2])
+    with c_tabla:
+        st.caption(f"{res['validos']:,} planes caben en el presupuesto; los {len(ranking)} mejores:")
+        st.dataframe(ranking, hide_index=True, use_container_width=True, column_config={
+            "Descuento": st.column_config.NumberColumn(format="%.2f%%"),
+            **{col: st.column_config.NumberColumn(format="dollar") for col in ("Precio final", "Enganche $", "Mensualidad")},
+        })
+        planes = list(zip(ranking["Lote"].tolist(), ranking["Lista"].tolist(), ranking["Enganche %"].tolist(), ranking["Plazo"].tolist()))
+        i = st.selectbox("Plan:", range(len(planes)), format_func=lambda i: "Lote {} · Lista {} · {}% · {} meses".format(*planes[i]))
+        if st.button("✅ Aplicar plan a la cotización", on_click=aplicar_plan, args=(planes[i],)):
+            st.rerun(scope="app")
+    with c_fig:
+        fr = res["frontera"]
+        st.plotly_chart(figura_pareto(fr["precio_final_venta"], fr["monto_enganche"], precio_final_venta, monto_enganche), use_container_width=True)
+
+seccion_mercado(precio_lista_base, descuento_pct, monto_descuento, precio_final_venta, precio_futuro_lista10, m2_construccion)
+seccion_plusvalia(valor_proyeccion, plusvalia_preventa, valor_final_5y)
+seccion_rentas(precio_final_venta, cotizacion_pdf)
+seccion_plan(enganche_pct, monto_enganche, plazo_meses, mensualidad, saldo_final, cotizacion_pdf, f"Cotizacion_{cliente_nombre}_{num_lote_selec}.pdf")
+seccion_optimizador(idx_lote, precio_final_venta, monto_enganche, mensualidad)
+
+# La página ya está pintada: fpdf, el logo y los escenarios Monte Carlo se calientan en segundo plano
+precargar(lambda: figura_abanico(valor_proyeccion))
+
+# --- PERFIL DE LA CORRIDA ---
+registrar("corrida", time.perf_counter() - inicio_corrida)
+if ARCHIVO_PROMETHEUS:
+    try: escribir_prometheus(ARCHIVO_PROMETHEUS)
+    except OSError: pass
+if perfil:
+    with st.sidebar.expander("⏱️ Perfil de la corrida", expanded=True):
+        st.dataframe(pd.DataFrame({"ms": tiempos_corrida}).sort_values("ms", ascending=False).round(2), use_container_width=True)
+        acumulado = pd.DataFrame(resumen(), index=["n", "prom. ms", "máx. ms"]).T
+        st.caption("Acumulado del proceso (incluye fragmentos y otras sesiones)")
+        st.dataframe(acumulado.round(2), use_container_width=True)
+        st.json(contadores(), expanded=False)
+        st.download_button("Métricas (Prometheus)", prometheus, file_name="metricas.prom", mime="text/plain", on_click="ignore")
+        if profiler:
+            profiler.disable()
+            ruta_perfil = os.path.join(CACHE_DIR, "perfiles", f"app_{datetime.now():%Y%m%d_%H%M%S}.pstats")
+            os.makedirs(os.path.dirname(ruta_perfil), exist_ok=True)
+            profiler.dump_stats(ruta_perfil)
+            st.caption(f"cProfile guardado en `{os.path.relpath(ruta_perfil)}` (ábrelo con `python -m pstats`)")
@@ -0,0 +1,209 @@
+"""Bitácora de auditoría de cotizaciones (SQLite de sólo inserción, un archivo por mes).
+
+Cada cotización mostrada o PDF descargado se encola con `registrar()`, que sólo
+hace un `put_nowait` y regresa: un hilo de fondo junta los registros y los escribe
+por lotes (una transacción por lote), así el rerun y la descarga no esperan al
+disco. Si la cola se llena (disco lento o bloqueado) los registros nuevos se
+descartan y se cuentan en la métrica `auditoria_descartados`.
+
+Los archivos rotan por mes (`auditoria/cotizaciones_AAAA-MM.db`). Las tablas no
+admiten UPDATE ni DELETE, y tienen índices por lote, asesor y fecha para las
+consultas de la página de administración.
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from metricas import contar
+
+DIR_AUDITORIA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "auditoria")
+COTIZACION, PDF = "cotizacion", "pdf"
+EVENTOS = (COTIZACION, PDF)
+CAMPOS = ("fecha", "evento", "desarrollo", "lote", "lista", "enganche_pct", "plazo_meses",
+          "cliente", "asesor", "precio_final", "monto_enganche", "mensualidad", "sesion")
+# Registros pendientes máximos en memoria y máximos por transacción
+MAX_PENDIENTES = 50_000
+LOTE_ESCRITURA = 1_000
+# Segundos que el escritor espera a que se junten más registros antes de escribir
+INTERVALO = 1.0
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cotizaciones (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    evento TEXT NOT NULL,
+    desarrollo TEXT,
+    lote INTEGER,
+    lista INTEGER,
+    enganche_pct REAL,
+    plazo_meses INTEGER,
+    cliente TEXT,
+    asesor TEXT,
+    precio_final REAL,
+    monto_enganche REAL,
+    mensualidad REAL,
+    sesion TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_cot_lote ON cotizaciones(desarrollo, lote, fecha);
+CREATE INDEX IF NOT EXISTS idx_cot_asesor ON cotizaciones(asesor, fecha);
+CREATE INDEX IF NOT EXISTS idx_cot_fecha ON cotizaciones(fecha);
+CREATE TRIGGER IF NOT EXISTS cot_sin_update BEFORE UPDATE ON cotizaciones
+    BEGIN SELECT RAISE(ABORT, 'La bitácora de auditoría es de sólo inserción'); END;
+CREATE TRIGGER IF NOT EXISTS cot_sin_delete BEFORE DELETE ON cotizaciones
+    BEGIN SELECT RAISE(ABORT, 'La bitácora de auditoría es de sólo inserción'); END;
+"""
+
+
+def _mes(fecha):
+    return fecha[:7]
+
+def _meses(desde, hasta):
+    """Meses 'AAAA-MM' de `desde` a `hasta` (fechas), ambos incluidos."""
+    año, mes = desde.year, desde.month
+    while (año, mes) <= (hasta.year, hasta.month):
+        yield f"{año:04d}-{mes:02d}"
+        año, mes = (año + 1, 1) if mes == 12 else (año, mes + 1)
+
+
+class Auditoria:
+    """Cola en memoria + hilo escritor; las consultas abren su propia conexión de sólo lectura."""
+
+    def __init__(self, directorio=None, max_pendientes=MAX_PENDIENTES):
+        # ANANDA_AUDITORIA cambia la carpeta: las herramientas que manejan app.py (bench, carga,
+        # memoria) la apuntan a una carpeta temporal para no ensuciar la bitácora real
+        self.directorio = directorio or os.environ.get("ANANDA_AUDITORIA") or DIR_AUDITORIA
+        self._cola = queue.Queue(max_pendientes)
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def ruta(self, mes):
+        return os.path.join(self.directorio, f"cotizaciones_{mes}.db")
+
+    # --- ESCRITURA ---
+
+    def registrar(self, evento, **campos):
+        """Encola un registro (no bloquea). Regresa False si la cola estaba llena y se descartó."""
+        if evento not in EVENTOS:
+            raise ValueError(f"Evento desconocido: {evento}")
+        fecha = campos.get("fecha")
+        if fecha is None:
+            fecha = datetime.now().isoformat(timespec="seconds")
+        else:
+            # La fecha decide el archivo del mes: una vacía o mal formada no debe crear `cotizaciones_.db`
+            try: datetime.fromisoformat(str(fecha).strip())
+            except ValueError: raise ValueError(f"Fecha inválida para la auditoría: {fecha!r}") from None
+            fecha = str(fecha).strip()
+        campos.update(evento=evento, fecha=fecha)
+        self._iniciar()
+        try:
+            self._cola.put_nowait(tuple(campos.get(c) for c in CAMPOS))
+        except queue.Full:
+            contar("auditoria_descartados")
+            return False
+        return True
+
+    def vaciar(self, timeout=None):
+        """Espera a que se escriban los registros encolados hasta ahora."""
+        with self._cola.all_tasks_done:
+            return self._cola.all_tasks_done.wait_for(lambda: not self._cola.unfinished_tasks, timeout)
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def _iniciar(self):
+        if self._hilo is None:
+            with self._lock:
+                if self._hilo is None:
+                    self._hilo = threading.Thread(target=self._escritor, name="auditoria", daemon=True)
+                    self._hilo.start()
+                    # Al salir el proceso se da un momento al escritor para no perder lo encolado
+                    atexit.register(self.vaciar, 5)
+
+    def _escritor(self):
+        conexiones = {}
+        while True:
+            registros = [self._cola.get()]
+            # Junta lo que llegue en INTERVALO (o hasta LOTE_ESCRITURA) para escribir en una sola transacción
+            if self._cola.qsize() < LOTE_ESCRITURA: time.sleep(INTERVALO)
+            while len(registros) < LOTE_ESCRITURA:
+                try: registros.append(self._cola.get_nowait())
+                except queue.Empty: break
+            try:
+                self._escribir(conexiones, registros)
+                contar("auditoria_registros", len(registros))
+            except Exception:
+                # Disco lleno, carpeta sin permisos, etc.: se pierden estos registros pero el escritor sigue vivo
+                contar("auditoria_errores", len(registros))
+            finally:
+                for _ in registros: self._cola.task_done()
+
+    def _escribir(self, conexiones, registros):
+        por_mes = {}
+        for r in registros:
+            por_mes.setdefault(_mes(r[0]), []).append(r)
+        for mes, filas in por_mes.items():
+            con = conexiones.get(mes)
+            if con is None:
+                # Mes nuevo: rota a otro archivo y suelta los de meses anteriores
+                for viejo in [m for m in conexiones if m < mes]: conexiones.pop(viejo).close()
+                con = conexiones[mes] = self._abrir(mes)
+            with con:
+                con.executemany(f"INSERT INTO cotizaciones ({', '.join(CAMPOS)}) VALUES ({', '.join('?' * len(CAMPOS))})", filas)
+
+    def _abrir(self, mes):
+        os.makedirs(self.directorio, exist_ok=True)
+        con = sqlite3.connect(self.ruta(mes), timeout=10, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.executescript(_ESQUEMA)
+        return con
+
+    # --- CONSULTAS ---
+
+    def _consultar(self, sql, desde, hasta, filtros):
+        """Corre `sql` (con {where}) en cada archivo mensual del rango y junta las filas."""
+        condiciones = ["fecha >= ?", "fecha < ?"]
+        params = [desde.isoformat(), (hasta + timedelta(days=1)).isoformat()]
+        for campo, valor in filtros.items():
+            if valor not in (None, ""):
+                condiciones.append(f"{campo} = ?")
+                params.append(valor)
+        filas = []
+        for mes in _meses(desde, hasta):
+            ruta = self.ruta(mes)
+            if not os.path.exists(ruta):
+                continue
+            con = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True, timeout=10)
+            try:
+                filas += con.execute(sql.format(where=" AND ".join(condiciones)), params).fetchall()
+            finally:
+                con.close()
+        return filas
+
+    def registros(self, desde, hasta, desarrollo=None, lote=None, asesor=None, evento=None, limite=1000):
+        """Registros más recientes del rango de fechas como lista de dicts."""
+        filas = self._consultar(f"SELECT {', '.join(CAMPOS)} FROM cotizaciones WHERE {{where}} ORDER BY fecha DESC LIMIT {int(limite)}",
+                                desde, hasta, dict(desarrollo=desarrollo, lote=lote, asesor=asesor, evento=evento))
+        filas.sort(key=lambda f: f[0], reverse=True)
+        return [dict(zip(CAMPOS, f)) for f in filas[:limite]]
+
+    def conteo(self, por, desde, hasta, desarrollo=None, lote=None, asesor=None, evento=None):
+        """{valor de `por`: número de registros} en el rango, p. ej. cotizaciones por lote de esta semana."""
+        if por not in ("lote", "asesor", "evento", "dia"):
+            raise ValueError(f"No se puede agrupar por {por}")
+        columna = "substr(fecha, 1, 10)" if por == "dia" else por
+        conteo = {}
+        for valor, n in self._consultar(f"SELECT {columna}, COUNT(*) FROM cotizaciones WHERE {{where}} GROUP BY 1",
+                                        desde, hasta, dict(desarrollo=desarrollo, lote=lote, asesor=asesor, evento=evento)):
+            conteo[valor] = conteo.get(valor, 0) + n
+        return dict(sorted(conteo.items(), key=lambda kv: (kv[0] is None, kv[0])))
+
+
+def inicio_semana(hoy=None):
+    hoy = hoy or date.today()
+    return hoy - timedelta(days=hoy.weekday())
+
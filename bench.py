@@ -0,0 +1,231 @@
+"""Benchmarks de los caminos calientes de la app.
+
+    python bench.py run                 # corre todo y lo agrega a bench_historial.json
+    python bench.py run -k pdf -k carga # sólo los benchmarks cuyo nombre contiene "pdf" o "carga"
+    python bench.py comparar            # última corrida contra la anterior; sale con 1 si hay regresiones
+    python bench.py comparar --umbral 0.2 --contra 0
+
+Cada benchmark reporta la mediana en milisegundos de varias repeticiones.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+HISTORIAL = os.path.join(RAIZ, "bench_historial.json")
+UMBRAL_DEFAULT = 0.10
+TAMAÑOS_HOJA = (44, 1_000, 50_000)
+TAMAÑOS_LOTE = (1_000, 100_000)
+
+
+def medir(fn, repeticiones=7, minimo_s=0.2):
+    """Mediana en ms de `fn()`; repite hasta `repeticiones` veces y al menos `minimo_s` segundos."""
+    fn()  # calentamiento
+    tiempos = []
+    inicio = time.perf_counter()
+    while len(tiempos) < repeticiones or (time.perf_counter() - inicio < minimo_s and len(tiempos) < 1000):
+        t = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t) * 1000)
+    return statistics.median(tiempos)
+
+def hoja_sintetica(n, ruta, semilla=0):
+    """Escribe una hoja de precios con el formato de precios.csv y `n` lotes."""
+    rng = np.random.default_rng(semilla)
+    base = rng.uniform(3.0e6, 3.6e6, n)
+    listas = base[:, None] * (1.0203 ** np.arange(10))[None, :]
+    encabezado = "LOTE,DISPONIBILIDAD,Total Terreno,NORTE,SUR,ESTE,OESTE,Total Construccion," + ",".join(f"Lista {k}" for k in range(1, 11))
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(encabezado + "\n")
+        for i in range(n):
+            precios = ",".join(f'" $ {p:,.0f} "' for p in listas[i])
+            f.write(f"{i + 1},,216.05,21 m con calle,21 m con lote, 7 m con pasillo,7 m con calle,128.8,{precios}\n")
+    return ruta
+
+# --- BENCHMARKS ---
+
+def bench_carga(resultados, tmp):
+    import datos
+    # Los snapshots de las hojas sintéticas van a `tmp`, no al .cache/ del repo
+    original = datos.CACHE_DIR
+    datos.CACHE_DIR = os.path.join(tmp, "cache")
+    try:
+        for n in TAMAÑOS_HOJA:
+            ruta = hoja_sintetica(n, os.path.join(tmp, f"precios_{n}.csv"))
+            rep = 3 if n > 10_000 else 7
+            resultados[f"carga/parsear_{n}"] = medir(lambda: datos.parsear_precios(ruta), rep)
+            datos.leer_precios(ruta)
+            resultados[f"carga/snapshot_{n}"] = medir(lambda: datos.leer_precios(ruta), rep)
+    finally:
+        datos.CACHE_DIR = original
+
+def bench_cotizacion(resultados, tmp):
+    import cotizador
+    rng = np.random.default_rng(0)
+    pares = list(zip(rng.integers(0, 14, 1000).tolist(), rng.choice(cotizador.OPCIONES_ENGANCHE, 1000).tolist()))
+    resultados["cotizacion/obtener_descuento_x1000"] = medir(lambda: [cotizador.obtener_descuento(p, e) for p, e in pares])
+    precios = rng.uniform(3.0e6, 4.0e6, (44, cotizador.NUM_LISTAS))
+    for n in TAMAÑOS_LOTE:
+        plazos = rng.integers(0, 14, n)
+        enganches = rng.choice(cotizador.OPCIONES_ENGANCHE, n)
+        lotes = rng.integers(0, 44, n)
+        listas = rng.integers(1, cotizador.NUM_LISTAS + 1, n)
+        resultados[f"cotizacion/obtener_descuentos_{n}"] = medir(lambda: cotizador.obtener_descuentos(plazos, enganches))
+        resultados[f"cotizacion/cotizar_{n}"] = medir(lambda: cotizador.cotizar(precios, lotes, listas, enganches, plazos))
+    resultados["cotizacion/combinaciones_44_lotes"] = medir(lambda: cotizador.cotizar_combinaciones(precios))
+    for n in (1, 44, 50_000):
+        hoja = rng.uniform(3.0e6, 4.0e6, (n, cotizador.NUM_LISTAS))
+        resultados[f"cotizacion/optimizar_planes_{n}_lotes"] = medir(lambda: cotizador.optimizar_planes(hoja, 60000, 1.5e6))
+
+def bench_graficas(resultados, tmp):
+    import graficas
+    llamadas = {
+        "mercado": lambda: graficas.figura_mercado(3.3e6, 128.8),
+        "plusvalia": lambda: graficas.figura_plusvalia(4.3e6),
+        "renta": lambda: graficas.figura_renta(500000.0, 180000.0, 36000.0),
+        "abanico": lambda: graficas.figura_abanico(4.3e6),
+        "mapa_roi": lambda: graficas.figura_mapa_roi(3.3e6, 3000, 0.25),
+        "equilibrio": lambda: graficas.figura_equilibrio(3000),
+        "tornado": lambda: graficas.figura_tornado(3.3e6, 4500, 0.45, 0.25, 3000),
+    }
+    original = graficas.cache_figuras
+    try:
+        for nombre, fn in llamadas.items():
+            def fallo():
+                graficas.cache_figuras = graficas.CacheFiguras()
+                fn()
+            resultados[f"graficas/{nombre}_construir"] = medir(fallo, 5)
+            graficas.cache_figuras = graficas.CacheFiguras()
+            resultados[f"graficas/{nombre}_cache"] = medir(fn)
+    finally:
+        graficas.cache_figuras = original
+
+def bench_pdf(resultados, tmp):
+    from amortizacion import FRANCES
+    from pdf_cotizacion import CAMPOS_PDF, create_pdf
+    c = dict.fromkeys(CAMPOS_PDF, 1.0)
+    c.update(cliente_nombre="Cliente Benchmark", asesor_nombre="Asesor", num_lote_selec=1, enganche_pct=30, credito=None)
+    for filas in (1, 6, 13):
+        c["plazo_meses"] = filas
+        resultados[f"pdf/create_pdf_{filas}_filas"] = medir(lambda: create_pdf(c))
+    c.update(saldo_final=2.5e6, credito=(0.115, 360, FRANCES, 0.0))
+    resultados["pdf/create_pdf_credito_360"] = medir(lambda: create_pdf(c))
+
+def bench_amortizacion(resultados, tmp):
+    from amortizacion import ALEMAN, amortizar, abonos_periodicos
+    for meses in (60, 360):
+        resultados[f"amortizacion/frances_{meses}"] = medir(lambda: amortizar(2.5e6, 0.115, meses))
+    resultados["amortizacion/aleman_360_abonos"] = medir(lambda: amortizar(2.5e6, 0.115, 360, ALEMAN, abonos_periodicos(360, 50000)))
+
+def bench_auditoria(resultados, tmp):
+    from auditoria import COTIZACION, Auditoria
+    bitacora = Auditoria(os.path.join(tmp, "auditoria"))
+    registro = dict(desarrollo="Ananda Kino", lote=7, lista=1, enganche_pct=30, plazo_meses=12, cliente="Cliente", asesor="Asesor",
+                    precio_final=3.3e6, monto_enganche=1e6, mensualidad=83000.0, sesion="bench")
+    # Lo que paga el rerun: encolar (la escritura va en el hilo de fondo)
+    resultados["auditoria/registrar_x1000"] = medir(lambda: [bitacora.registrar(COTIZACION, **registro) for _ in range(1000)])
+    bitacora.vaciar()
+
+def bench_rerun(resultados, tmp):
+    from streamlit.testing.v1 import AppTest
+    # Las cotizaciones del benchmark no van a la bitácora de auditoría real
+    os.environ["ANANDA_AUDITORIA"] = os.path.join(tmp, "auditoria")
+    at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=120)
+    at.run()
+    resultados["rerun/app_completa"] = medir(at.run, 5, 1.0)
+
+BENCHMARKS = {
+    "carga": bench_carga,
+    "cotizacion": bench_cotizacion,
+    "graficas": bench_graficas,
+    "pdf": bench_pdf,
+    "amortizacion": bench_amortizacion,
+    "auditoria": bench_auditoria,
+    "rerun": bench_rerun,
+}
+
+# --- HISTORIAL ---
+
+def leer_historial(ruta=HISTORIAL):
+    if not os.path.exists(ruta):
+        return []
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+def guardar_corrida(resultados, ruta=HISTORIAL):
+    historial = leer_historial(ruta)
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    historial.append({"fecha": datetime.now().isoformat(timespec="seconds"), "commit": commit, "resultados": resultados})
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(historial, f, indent=1, ensure_ascii=False)
+    return len(historial) - 1
+
+def comparar(base, nueva, umbral=UMBRAL_DEFAULT):
+    """Filas (nombre, ms_base, ms_nuevo, cambio) de los benchmarks de `nueva` y las regresiones por encima de `umbral`."""
+    filas, regresiones = [], []
+    for nombre in sorted(nueva):
+        a, b = base.get(nombre), nueva.get(nombre)
+        cambio = (b - a) / a if a and b is not None else None
+        filas.append((nombre, a, b, cambio))
+        if cambio is not None and cambio > umbral:
+            regresiones.append(nombre)
+    return filas, regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de carga, cotización, gráficas, PDF y rerun de la app.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_run = sub.add_parser("run", help="Corre los benchmarks y guarda el resultado en el historial")
+    p_run.add_argument("-k", dest="filtros", action="append", default=[], help="Sólo benchmarks cuyo nombre contenga este texto")
+    p_run.add_argument("--no-guardar", action="store_true", help="No agregar la corrida al historial")
+    p_cmp = sub.add_parser("comparar", help="Compara la última corrida contra otra del historial")
+    p_cmp.add_argument("--umbral", type=float, default=UMBRAL_DEFAULT, help="Regresión mínima a reportar (default: 0.10 = 10%%)")
+    p_cmp.add_argument("--contra", type=int, default=-2, help="Índice de la corrida base (default: la penúltima)")
+    p_cmp.add_argument("--historial", default=HISTORIAL)
+    args = parser.parse_args(argv)
+
+    if args.comando == "run":
+        resultados = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for grupo, fn in BENCHMARKS.items():
+                if args.filtros and not any(f.split("/")[0] in grupo or grupo in f for f in args.filtros):
+                    continue
+                antes = set(resultados)
+                fn(resultados, tmp)
+                if args.filtros:
+                    for nombre in set(resultados) - antes:
+                        if not any(f in nombre for f in args.filtros):
+                            del resultados[nombre]
+                for nombre in sorted(set(resultados) - antes):
+                    print(f"{nombre:<45} {resultados[nombre]:10.3f} ms")
+        if not args.no_guardar:
+            print(f"Corrida #{guardar_corrida(resultados)} guardada en {os.path.relpath(HISTORIAL)}")
+        return 0
+
+    historial = leer_historial(args.historial)
+    if len(historial) < 2:
+        parser.error("Se necesitan al menos dos corridas en el historial")
+    base, nueva = historial[args.contra], historial[-1]
+    filas, regresiones = comparar(base["resultados"], nueva["resultados"], args.umbral)
+    print(f"{'benchmark':<45} {base['commit'] or base['fecha']:>12} {nueva['commit'] or nueva['fecha']:>12}   cambio")
+    for nombre, a, b, cambio in filas:
+        marca = "  <-- REGRESIÓN" if nombre in regresiones else ""
+        fmt = lambda v: f"{v:12.3f}" if v is not None else f"{'-':>12}"
+        print(f"{nombre:<45} {fmt(a)} {fmt(b)}   {f'{cambio:+.1%}' if cambio is not None else '':>7}{marca}")
+    if regresiones:
+        print(f"{len(regresiones)} regresiones por encima de {args.umbral:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Prueba de carga de app.py: N sesiones simultáneas con recorridos realistas.
+
+Cada sesión es un proceso que abre app.py en modo headless (AppTest) y repite un
+recorrido de asesor: elegir lote, cambiar de lista, arrastrar el enganche (varios
+reruns seguidos), mover el simulador de rentas y descargar el PDF (se ejecuta la
+descarga diferida, igual que al pulsar el botón). Para cada número de sesiones
+reporta percentiles de latencia por rerun, CPU y RSS, y la rodilla: el primer nivel
+en que el p90 pasa de `--degradacion` veces el de una sola sesión.
+
+    python carga_app.py                          # 1 2 4 8 16 sesiones, 20 s por nivel
+    python carga_app.py --sesiones 1 4 16 32 --duracion 30
+
+Las sesiones van en procesos porque AppTest usa un runtime global por proceso. Un
+servidor real atiende todas las sesiones en un solo proceso (un GIL), así que la
+columna de CPU por rerun es la que da la capacidad: un núcleo aguanta del orden de
+1000 / (CPU ms por rerun) reruns por segundo. La bitácora de auditoría de las
+sesiones de carga va a una carpeta temporal.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from memoria_sesiones import RAIZ, _selector, rss_mb
+
+SESIONES_DEFAULT = (1, 2, 4, 8, 16)
+PASOS = ("lote", "lista", "enganche", "rentas", "pdf")
+# Segundos máximos para que todas las sesiones arranquen, y de margen para reportar tras `duracion`
+ARRANQUE_MAX = 600
+
+
+def _cpu_s():
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    return uso.ru_utime + uso.ru_stime
+
+def _capturar_descargas():
+    """{file_id: callable} de las descargas diferidas (AppTest tira su runtime al terminar cada corrida)."""
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    descargas = {}
+    original = MediaFileManager.add_deferred
+    def add_deferred(self, data_callable, *args, **kwargs):
+        file_id = original(self, data_callable, *args, **kwargs)
+        descargas[file_id] = data_callable
+        return file_id
+    MediaFileManager.add_deferred = add_deferred
+    return descargas
+
+def _recorrido(at, rng, descargas, registrar):
+    """Una vuelta del recorrido; `registrar(paso, segundos)` por cada interacción."""
+    def paso(nombre, fn):
+        inicio = time.perf_counter()
+        fn()
+        registrar(nombre, time.perf_counter() - inicio)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    lote = _selector(at, "Lote:")
+    paso("lote", lambda: lote.set_value(int(rng.choice(lote.options).split()[1])).run())
+    lista = _selector(at, "Lista de Precio:")
+    paso("lista", lambda: lista.set_value(rng.randint(1, len(lista.options))).run())
+    # Arrastrar el slider manda un rerun por cada valor en el que se suelta
+    enganche = next(s for s in at.sidebar.select_slider if s.label == "% Enganche:")
+    opciones = [int(o) for o in enganche.options]
+    i = rng.randrange(len(opciones) - 2)
+    for valor in opciones[i:i + 3]:
+        paso("enganche", lambda: enganche.set_value(valor).run())
+    ocupacion = next(s for s in at.slider if s.label == "Ocupación Anual %:")
+    paso("rentas", lambda: ocupacion.set_value(rng.randint(20, 80)).run())
+    tarifa = next(n for n in at.number_input if n.label == "Tarifa Noche ($):")
+    paso("rentas", lambda: tarifa.set_value(float(rng.randrange(3000, 8001, 500))).run())
+    botones = [b for b in at.get("download_button") if b.proto.label == "📥 DESCARGAR PDF"]
+    if botones:
+        paso("pdf", descargas[botones[0].proto.deferred_file_id])
+    descargas.clear()
+
+def _sesion(i, barrera, duracion, cola):
+    """Proceso de una sesión: arranca la app, espera a las demás y repite el recorrido `duracion` segundos."""
+    # Los avisos de Streamlit por cada rerun ensucian la tabla; los errores regresan por la cola
+    sys.stderr = open(os.devnull, "w")
+    from streamlit.testing.v1 import AppTest
+    rng = random.Random(i)
+    descargas = _capturar_descargas()
+    tiempos = []
+    try:
+        at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=120)
+        at.run()
+        barrera.wait(timeout=ARRANQUE_MAX)
+        cpu, inicio = _cpu_s(), time.perf_counter()
+        while time.perf_counter() - inicio < duracion:
+            _recorrido(at, rng, descargas, lambda paso, s: tiempos.append((paso, s)))
+        cola.put({"tiempos": tiempos, "cpu_s": _cpu_s() - cpu,
+                  "segundos": time.perf_counter() - inicio, "rss_mb": rss_mb()})
+    except Exception as e:
+        barrera.abort()
+        cola.put({"error": f"sesión {i}: {type(e).__name__}: {e}"})
+
+def medir_nivel(n, duracion, ctx):
+    """Corre `n` sesiones simultáneas y regresa sus resultados (uno por proceso)."""
+    barrera, cola = ctx.Barrier(n), ctx.Queue()
+    procesos = [ctx.Process(target=_sesion, args=(i, barrera, duracion, cola)) for i in range(n)]
+    for p in procesos: p.start()
+    try:
+        # Si un proceso muere sin reportar (p. ej. sin memoria) no se espera para siempre
+        resultados = [cola.get(timeout=duracion + ARRANQUE_MAX) for _ in procesos]
+    except BaseException:
+        # Las que siguen vivas (o esperando en la barrera) no deben quedar huérfanas
+        for p in procesos:
+            if p.is_alive(): p.terminate()
+        raise
+    finally:
+        for p in procesos: p.join()
+    errores = [r["error"] for r in resultados if "error" in r]
+    if errores:
+        raise RuntimeError("; ".join(errores))
+    return resultados
+
+def resumir(n, resultados):
+    lat = np.array([s for r in resultados for _, s in r["tiempos"]]) * 1000
+    segundos = max(r["segundos"] for r in resultados)
+    cpu_s = sum(r["cpu_s"] for r in resultados)
+    p50, p90, p99 = np.percentile(lat, [50, 90, 99])
+    return {
+        "sesiones": n, "reruns": len(lat), "p50": p50, "p90": p90, "p99": p99,
+        "reruns_s": len(lat) / segundos, "cpu_pct": cpu_s / segundos * 100, "cpu_ms_rerun": cpu_s * 1000 / len(lat),
+        "rss_mb": float(np.mean([r["rss_mb"] for r in resultados])),
+        "por_paso": {paso: float(np.percentile([s for r in resultados for p, s in r["tiempos"] if p == paso], 90)) * 1000
+                     for paso in PASOS if any(p == paso for r in resultados for p, _ in r["tiempos"])},
+    }
+
+def rodilla(filas, degradacion):
+    """Primer nivel cuyo p90 supera `degradacion` veces el p90 del primer nivel (None si no hay)."""
+    base = filas[0]["p90"]
+    return next((f for f in filas[1:] if f["p90"] > degradacion * base), None)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de app.py con sesiones headless simultáneas.")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=list(SESIONES_DEFAULT), help="Niveles de sesiones simultáneas (default: 1 2 4 8 16)")
+    parser.add_argument("--duracion", type=float, default=20.0, help="Segundos de recorridos por nivel (default: 20)")
+    parser.add_argument("--degradacion", type=float, default=2.0, help="Factor de p90 contra 1 sesión que marca la rodilla (default: 2)")
+    args = parser.parse_args(argv)
+
+    # Procesos nuevos (no fork) para que cada sesión importe Streamlit y la app desde cero
+    ctx = multiprocessing.get_context("spawn")
+    os.environ["ANANDA_AUDITORIA"] = tempfile.mkdtemp(prefix="auditoria_carga_")
+    print(f"{os.cpu_count()} núcleos; {args.duracion:.0f} s por nivel")
+    print(f"{'sesiones':>8} {'reruns':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'rerun/s':>8} {'CPU %':>7} {'CPU ms/rerun':>13} {'RSS MB/ses':>11}  p90 por paso (ms)")
+    filas = []
+    for n in sorted(set(args.sesiones)):
+        f = resumir(n, medir_nivel(n, args.duracion, ctx))
+        filas.append(f)
+        pasos = " ".join(f"{p}={ms:.0f}" for p, ms in f["por_paso"].items())
+        print(f"{n:8d} {f['reruns']:7d} {f['p50']:8.1f} {f['p90']:8.1f} {f['p99']:8.1f} {f['reruns_s']:8.1f} {f['cpu_pct']:7.0f} "
+              f"{f['cpu_ms_rerun']:13.1f} {f['rss_mb']:11.1f}  {pasos}", flush=True)
+
+    r = rodilla(filas, args.degradacion)
+    if r:
+        print(f"Rodilla: {r['sesiones']} sesiones (p90 {filas[0]['p90']:.0f} -> {r['p90']:.0f} ms, más de {args.degradacion:g}x)")
+    else:
+        print(f"Sin rodilla hasta {filas[-1]['sesiones']} sesiones (p90 nunca pasó de {args.degradacion:g}x el de una sesión)")
+    print(f"Un proceso de Streamlit (un núcleo) da para ~{1000 / filas[0]['cpu_ms_rerun']:.0f} reruns/s con este recorrido")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
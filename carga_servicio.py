@@ -0,0 +1,87 @@
+"""Prueba de carga del servicio de cotizaciones (`servicio.py`).
+
+Lanza N clientes concurrentes con conexiones keep-alive contra un servicio ya
+levantado y reporta latencia p50/p99 y peticiones por segundo por endpoint.
+
+    python servicio.py &
+    python carga_servicio.py -c 16 -n 2000 --pdf 0.1
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from cotizador import NUM_LISTAS, OPCIONES_ENGANCHE, OPCIONES_PLAZO
+
+
+def _peticion_aleatoria(rng, lotes):
+    return {
+        "cliente": f"Cliente {rng.randint(1, 9999)}", "asesor": "Carga",
+        "lote": rng.choice(lotes), "lista": rng.randint(1, NUM_LISTAS),
+        "enganche": rng.choice(OPCIONES_ENGANCHE), "plazo": rng.choice(OPCIONES_PLAZO),
+    }
+
+def _cliente(host, port, n, prob_pdf, lotes, semilla, resultados):
+    rng = random.Random(semilla)
+    con = http.client.HTTPConnection(host, port, timeout=60)
+    for _ in range(n):
+        ruta = "/pdf" if rng.random() < prob_pdf else "/cotizacion"
+        cuerpo = json.dumps(_peticion_aleatoria(rng, lotes))
+        inicio = time.perf_counter()
+        try:
+            con.request("POST", ruta, body=cuerpo, headers={"Content-Type": "application/json"})
+            r = con.getresponse()
+            r.read()
+            ok = r.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            con.close()
+            con = http.client.HTTPConnection(host, port, timeout=60)
+        resultados.append((ruta, time.perf_counter() - inicio, ok))
+    con.close()
+
+def _resumen(nombre, lat, errores, segundos):
+    lat_ms = np.asarray(lat) * 1000
+    if not len(lat_ms):
+        return f"{nombre:<12} sin peticiones"
+    p50, p99 = np.percentile(lat_ms, [50, 99])
+    return f"{nombre:<12} n={len(lat_ms):<6} err={errores:<4} p50={p50:8.1f} ms  p99={p99:8.1f} ms  {len(lat_ms) / segundos:8.1f} req/s"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de cotizaciones.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("-c", "--concurrencia", type=int, default=8, help="Clientes simultáneos (default: 8)")
+    parser.add_argument("-n", "--peticiones", type=int, default=1000, help="Peticiones totales (default: 1000)")
+    parser.add_argument("--pdf", type=float, default=0.1, help="Fracción de peticiones a /pdf (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    con = http.client.HTTPConnection(args.host, args.port, timeout=10)
+    con.request("GET", "/lotes")
+    lotes = [l["lote"] for l in json.loads(con.getresponse().read())]
+    con.close()
+    if not lotes:
+        parser.error("El servicio no reporta lotes")
+
+    resultados = []
+    por_cliente = [args.peticiones // args.concurrencia + (i < args.peticiones % args.concurrencia) for i in range(args.concurrencia)]
+    hilos = [threading.Thread(target=_cliente, args=(args.host, args.port, n, args.pdf, lotes, i, resultados)) for i, n in enumerate(por_cliente)]
+    inicio = time.perf_counter()
+    for h in hilos: h.start()
+    for h in hilos: h.join()
+    segundos = time.perf_counter() - inicio
+
+    print(f"{args.peticiones} peticiones, {args.concurrencia} clientes, {segundos:.2f}s")
+    for ruta in ("/cotizacion", "/pdf"):
+        filas = [r for r in resultados if r[0] == ruta]
+        print(_resumen(ruta, [r[1] for r in filas if r[2]], sum(not r[2] for r in filas), segundos))
+    print(_resumen("total", [r[1] for r in resultados if r[2]], sum(not r[2] for r in resultados), segundos))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Motor de cotización de Ananda Kino.
+
+Funciones puras (sin Streamlit) que calculan precio, descuento y plan de pagos
+para lotes completos de combinaciones (lote, lista, enganche, plazo) en una sola
+pasada de NumPy.
+"""
+import numpy as np
+
+# --- MATRIZ DE DESCUENTOS ---
+TABLA_DESCUENTOS = {
+    0: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
+    1: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
+    2: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
+    3: {95: 0.105, 90: 0.095, 80: 0.085, 70: 0.075, 60: 0.065, 50: 0.055, 40: 0.045, 30: 0.035, 25: 0.025, 20: 0.020, 15: 0.015},
+    4: {95: 0.100, 90: 0.090, 80: 0.080, 70: 0.070, 60: 0.060, 50: 0.050, 40: 0.040, 30: 0.030, 25: 0.020, 20: 0.015, 15: 0.010},
+    5: {95: 0.095, 90: 0.085, 80: 0.075, 70: 0.065, 60: 0.055, 50: 0.045, 40: 0.035, 30: 0.025, 25: 0.015, 20: 0.010, 15: 0.005},
+    6: {95: 0.090, 90: 0.080, 80: 0.070, 70: 0.060, 60: 0.050, 50: 0.040, 40: 0.030, 30: 0.020, 25: 0.010, 20: 0.005},
+    7: {95: 0.085, 90: 0.075, 80: 0.065, 70: 0.055, 60: 0.045, 50: 0.035, 40: 0.025, 30: 0.015, 25: 0.005},
+    8: {95: 0.080, 90: 0.070, 80: 0.060, 70: 0.050, 60: 0.040, 50: 0.030, 40: 0.020, 30: 0.010},
+    9: {95: 0.075, 90: 0.065, 80: 0.055, 70: 0.045, 60: 0.035, 50: 0.025, 40: 0.015, 30: 0.005},
+    10: {95: 0.070, 90: 0.060, 80: 0.050, 70: 0.040, 60: 0.030, 50: 0.020, 40: 0.010},
+    11: {95: 0.0675, 90: 0.0575, 80: 0.0475, 70: 0.0375, 60: 0.0275, 50: 0.0175, 40: 0.0075},
+    12: {95: 0.065, 90: 0.055, 80: 0.045, 70: 0.035, 60: 0.025, 50: 0.015, 40: 0.005},
+    13: {95: 0.0625, 90: 0.0525, 80: 0.0425, 70: 0.0325, 60: 0.0225, 50: 0.0125, 40: 0.0025},
+}
+
+# --- PARÁMETROS COMERCIALES ---
+NUM_LISTAS = 10
+OPCIONES_ENGANCHE = (15, 20, 25, 30, 40, 50, 60, 70, 80, 90, 95)
+OPCIONES_PLAZO = tuple(range(0, 14))
+PRECIO_LISTA_DEFAULT = 3300000.0
+INCREMENTO_LISTA = 0.03
+# Precio final a la entrega de todo el proyecto (fijo, no depende de la lista 10)
+PRECIO_FUTURO_LISTA10 = 4300000.0
+
+
+# Enganche máximo (%) que indexa la tabla densa de descuentos
+MAX_ENGANCHE = 100
+
+
+def _compilar_descuentos(tabla):
+    """Convierte la tabla escalonada en una matriz densa [plazo, enganche % 0..MAX_ENGANCHE].
+
+    Cada nivel rellena desde su % hacia arriba, así que la celda [p, e] guarda el
+    descuento del nivel más alto <= e (0.0 si no existe ninguno para ese plazo).
+    """
+    densa = np.zeros((max(tabla) + 1, MAX_ENGANCHE + 1))
+    for plazo, niveles in tabla.items():
+        for nivel in sorted(niveles):
+            densa[plazo, nivel:] = niveles[nivel]
+    densa.flags.writeable = False
+    return densa
+
+_DESCUENTOS = _compilar_descuentos(TABLA_DESCUENTOS)
+# Copia en listas de Python: indexar floats nativos es más rápido que un escalar de NumPy
+_DESCUENTOS_FILAS = _DESCUENTOS.tolist()
+
+def obtener_descuento(plazo, enganche):
+    if plazo not in TABLA_DESCUENTOS or not enganche >= 0: return 0.0
+    return _DESCUENTOS_FILAS[int(plazo)][min(int(enganche), MAX_ENGANCHE)]
+
+def obtener_descuentos(plazos, enganches):
+    """Versión vectorizada de `obtener_descuento` (acepta arreglos con broadcasting)."""
+    plazos = np.asarray(plazos)
+    enganches = np.asarray(enganches, dtype=float)
+    valido = (plazos >= 0) & (plazos < _DESCUENTOS.shape[0]) & (plazos == np.floor(plazos)) & (enganches >= 0)
+    p = np.where(valido, plazos, 0).astype(np.intp)
+    e = np.clip(np.nan_to_num(enganches), 0, MAX_ENGANCHE).astype(np.intp)
+    return np.where(valido, _DESCUENTOS[p, e], 0.0)
+
+def matriz_precios(df):
+    """Matriz (n_lotes, NUM_LISTAS) de precios de lista, en el orden de filas de `df`.
+
+    Espera la hoja ya tipada por `datos.leer_precios` (columnas `lista_N` en float).
+
+    Las listas que no vienen en la hoja se estiman a partir de la lista 1 con un
+    incremento de INCREMENTO_LISTA por lista (o PRECIO_LISTA_DEFAULT si tampoco
+    existe la lista 1).
+    """
+    n = len(df)
+    col_l1 = next((c for c in df.columns if 'lista_1' in c), None)
+    base = df[col_l1].to_numpy(dtype=float) if col_l1 else np.full(n, PRECIO_LISTA_DEFAULT)
+    precios = np.empty((n, NUM_LISTAS))
+    for k in range(1, NUM_LISTAS + 1):
+        col = next((c for c in df.columns if f"lista_{k}" in c), None)
+        if col:
+            precios[:, k - 1] = df[col].to_numpy(dtype=float)
+        else:
+            precios[:, k - 1] = base * (1 + INCREMENTO_LISTA * (k - 1))
+    return precios
+
+def _validar_listas(lista):
+    # `lista - 1` indexa columnas: 0 daría la última lista y 11 un IndexError
+    if lista.size and (lista.min() < 1 or lista.max() > NUM_LISTAS):
+        raise ValueError(f"La lista debe estar entre 1 y {NUM_LISTAS}: {sorted(set(lista[(lista < 1) | (lista > NUM_LISTAS)].tolist()))}")
+
+def cotizar(precios_lista, lote_idx, lista, enganche, plazo, precio_futuro=PRECIO_FUTURO_LISTA10):
+    """Calcula todas las cifras derivadas de una o muchas cotizaciones.
+
+    `lote_idx` (fila en `precios_lista`), `lista` (1..NUM_LISTAS), `enganche` (%)
+    y `plazo` (meses) pueden ser escalares o arreglos; se combinan con las reglas
+    de broadcasting de NumPy. Regresa un dict de arreglos con la forma resultante.
+    Con `precio_futuro=None` (desarrollo sin precio a la entrega) la plusvalía es NaN.
+    """
+    lote_idx = np.asarray(lote_idx, dtype=np.intp)
+    lista = np.asarray(lista, dtype=np.intp)
+    enganche = np.asarray(enganche, dtype=float)
+    plazo = np.asarray(plazo, dtype=np.intp)
+    _validar_listas(lista)
+
+    # Se indexa antes de convertir: la matriz puede venir en float32 y de sólo lectura
+    precio_lista_base = np.asarray(precios_lista)[lote_idx, lista - 1].astype(float)
+    descuento_pct = obtener_descuentos(plazo, enganche)
+    monto_descuento = precio_lista_base * descuento_pct
+    precio_final_venta = precio_lista_base - monto_descuento
+    plusvalia_preventa = precio_final_venta * np.nan if precio_futuro is None else precio_futuro - precio_final_venta
+
+    monto_enganche = precio_final_venta * (enganche / 100.0)
+    saldo_final = precio_final_venta - monto_enganche
+    mensualidad = np.divide(monto_enganche, plazo, out=np.zeros(np.broadcast(monto_enganche, plazo).shape), where=plazo > 0)
+
+    return {
+        "precio_lista_base": precio_lista_base,
+        "descuento_pct": descuento_pct,
+        "monto_descuento": monto_descuento,
+        "precio_final_venta": precio_final_venta,
+        "plusvalia_preventa": plusvalia_preventa,
+        "monto_enganche": monto_enganche,
+        "saldo_final": saldo_final,
+        "mensualidad": mensualidad,
+    }
+
+def cotizar_combinaciones(precios_lista, listas=None, enganches=OPCIONES_ENGANCHE, plazos=OPCIONES_PLAZO):
+    """Cotiza todas las combinaciones lote × lista × enganche × plazo.
+
+    Los arreglos del resultado tienen forma (n_lotes, n_listas, n_enganches, n_plazos).
+    """
+    listas = np.arange(1, NUM_LISTAS + 1) if listas is None else np.asarray(listas)
+    lote_idx, lista, enganche, plazo = np.ix_(np.arange(len(precios_lista)), listas, np.asarray(enganches), np.asarray(plazos))
+    return cotizar(precios_lista, lote_idx, lista, enganche, plazo)
+
+# --- OPTIMIZADOR DE PLANES ---
+# Criterio -> (llave principal, llave de desempate); ambas se minimizan
+CRITERIOS_PLAN = {
+    "precio": ("precio_final_venta", "monto_enganche"),
+    "descuento": ("-descuento_pct", "precio_final_venta"),
+    "desembolso": ("monto_enganche", "precio_final_venta"),
+}
+
+def _frontera_pareto(precio, enganche):
+    """Índices de los planes no dominados (menor precio final y menor enganche)."""
+    orden = np.lexsort((precio, enganche))
+    precio_ord = precio[orden]
+    minimo_previo = np.concatenate(([np.inf], np.minimum.accumulate(precio_ord)[:-1]))
+    return orden[precio_ord < minimo_previo]
+
+def optimizar_planes(precios_lista, mensualidad_max=np.inf, enganche_max=np.inf, criterio="precio", lotes_idx=None,
+                     listas=None, enganches=OPCIONES_ENGANCHE, plazos=OPCIONES_PLAZO, top=10):
+    """Mejores combinaciones lote × lista × enganche × plazo que caben en el presupuesto del cliente.
+
+    Una combinación es válida si su mensualidad es <= `mensualidad_max` y el enganche
+    total <= `enganche_max`. Para un mismo plan (enganche, plazo) el precio final, el
+    enganche y la mensualidad crecen con el precio de lista, así que basta ordenar una
+    vez los precios de lista (lotes × listas): los válidos de cada plan son un prefijo
+    del orden y sus mejores `top` son los primeros. Así el costo no depende del número
+    de combinaciones sino de ordenar los precios.
+
+    Regresa {"ranking", "frontera", "validos"}: `ranking` son los `top` planes según
+    `criterio` (ver CRITERIOS_PLAN), `frontera` la frontera de Pareto precio final vs
+    enganche (ambos dicts de arreglos con las llaves de `cotizar` más `lote_idx`,
+    `lista`, `enganche` y `plazo`) y `validos` cuántas combinaciones caben.
+    """
+    if criterio not in CRITERIOS_PLAN:
+        raise ValueError(f"Criterio desconocido: {criterio}")
+    precios = np.asarray(precios_lista)
+    lotes_idx = np.arange(len(precios)) if lotes_idx is None else np.asarray(lotes_idx, dtype=np.intp)
+    listas = np.arange(1, NUM_LISTAS + 1) if listas is None else np.asarray(listas, dtype=np.intp)
+    _validar_listas(listas)
+    e, p = (a.ravel() for a in np.meshgrid(np.asarray(enganches, dtype=float), np.asarray(plazos, dtype=np.intp), indexing='ij'))
+    planes = np.arange(len(e))
+
+    base = precios[np.ix_(lotes_idx, listas - 1)].astype(float).ravel()
+    orden = np.argsort(base, kind='stable')
+    base_ord = base[orden]
+    n = len(base_ord)
+
+    def cabe(i, j):
+        # Misma aritmética que `cotizar`, para que el límite coincida con las cifras mostradas
+        c = cotizar(base_ord[:, None], np.clip(i, 0, max(n - 1, 0)), 1, e[j], p[j])
+        return (c["mensualidad"] <= mensualidad_max) & (c["monto_enganche"] <= enganche_max)
+
+    # Precio de lista máximo que cabe en cada plan y cuántas combinaciones lo cumplen
+    factor_final = 1 - obtener_descuentos(p, e)
+    factor_enganche = factor_final * e / 100.0
+    factor_mensualidad = np.divide(factor_enganche, p, out=np.zeros(len(p)), where=p > 0)
+    tope = np.minimum(np.divide(mensualidad_max, factor_mensualidad, out=np.full(len(p), np.inf), where=factor_mensualidad > 0),
+                      np.divide(enganche_max, factor_enganche, out=np.full(len(p), np.inf), where=factor_enganche > 0))
+    cuantos = np.searchsorted(base_ord, tope, 'right')
+    if n:
+        # Corrige el redondeo en el límite (grupos de precios iguales entran o salen juntos)
+        sobra = (cuantos > 0) & ~cabe(cuantos - 1, planes)
+        cuantos[sobra] = np.searchsorted(base_ord, base_ord[cuantos[sobra] - 1], 'left')
+        falta = (cuantos < n) & cabe(cuantos, planes)
+        cuantos[falta] = np.searchsorted(base_ord, base_ord[cuantos[falta]], 'right')
+
+    # Candidatos: los `top` precios de lista más bajos de cada plan
+    k = np.minimum(cuantos, top)
+    plan_c = np.repeat(planes, k)
+    flat = orden[np.arange(k.sum()) - np.repeat(np.cumsum(k) - k, k)]
+    lote_c, lista_c = lotes_idx[flat // len(listas)], listas[flat % len(listas)]
+    cot = cotizar(precios, lote_c, lista_c, e[plan_c], p[plan_c])
+    cot.update(lote_idx=lote_c, lista=lista_c, enganche=e[plan_c], plazo=p[plan_c])
+
+    def llave(nombre):
+        return -cot[nombre[1:]] if nombre.startswith("-") else cot[nombre]
+    principal, desempate = CRITERIOS_PLAN[criterio]
+    ranking = np.lexsort((lote_c, llave(desempate), llave(principal)))[:top]
+    frontera = _frontera_pareto(cot["precio_final_venta"], cot["monto_enganche"])
+    return {
+        "ranking": {c: v[ranking] for c, v in cot.items()},
+        "frontera": {c: v[frontera] for c, v in cot.items()},
+        "validos": int(cuantos.sum()),
+    }
@@ -0,0 +1,159 @@
+"""Lectura de la hoja de precios (`precios.csv`) sin depender de Streamlit.
+
+La hoja se parsea una sola vez a columnas tipadas (precios y superficies como
+float) y se guarda un snapshot binario columnar (`.npz`) en CACHE_DIR. Mientras
+el CSV no cambie (mismo mtime/tamaño, o mismo hash si sólo cambió el mtime) las
+siguientes cargas leen el snapshot en lugar del CSV.
+"""
+import csv
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+from cotizador import PRECIO_FUTURO_LISTA10
+from metricas import contar
+
+ARCHIVO_PRECIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "precios.csv")
+# Cada CSV en esta carpeta es la hoja de precios de otro desarrollo (el nombre sale del archivo)
+DIR_DESARROLLOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "desarrollos")
+DESARROLLO_DEFAULT = "Ananda Kino"
+# Precio final a la entrega por desarrollo; los que no aparecen no muestran cifras de plusvalía
+PRECIOS_FUTUROS = {DESARROLLO_DEFAULT: PRECIO_FUTURO_LISTA10}
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+# Subir cuando cambie el formato del snapshot o la forma de parsear la hoja
+VERSION_SNAPSHOT = 2
+M2_TERRENO_DEFAULT = 216.0
+M2_CONSTRUCCION_DEFAULT = 128.8
+
+
+def desarrollos():
+    """{nombre del desarrollo: ruta de su hoja de precios}, empezando por Ananda Kino."""
+    hojas = {DESARROLLO_DEFAULT: ARCHIVO_PRECIOS}
+    if os.path.isdir(DIR_DESARROLLOS):
+        for archivo in sorted(os.listdir(DIR_DESARROLLOS)):
+            nombre, ext = os.path.splitext(archivo)
+            if ext.lower() == '.csv':
+                hojas.setdefault(nombre.replace('_', ' ').strip().title(), os.path.join(DIR_DESARROLLOS, archivo))
+    return hojas
+
+def _normalizar_columnas(columnas):
+    return columnas.str.strip().str.lower().str.replace(' ', '_').str.replace('.', '').str.replace('(', '').str.replace(')', '')
+
+def _fila_encabezado(file_name):
+    # Algunas exportaciones traen una fila de título antes de los encabezados
+    with open(file_name, newline='', encoding='utf-8-sig') as f:
+        primera = next(csv.reader(f), [])
+    return 0 if "lote" in "".join(primera).lower() else 1
+
+def es_columna_numerica(col):
+    return col.startswith('lista_') or col in ('lote', 'total_terreno', 'total_construccion') or 'm2' in col
+
+def limpiar_moneda(serie):
+    """Convierte una columna completa de importes ("$ 3,359,776 ") a float; vacíos o inválidos -> 0.0."""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float).fillna(0.0)
+    limpio = serie.astype('string').str.replace(r'[$,\s]', '', regex=True)
+    return pd.to_numeric(limpio, errors='coerce').fillna(0.0).astype(float)
+
+def validar_esquema(df):
+    """Lanza ValueError si la hoja no trae lo mínimo para cotizar."""
+    if 'lote' not in df.columns:
+        raise ValueError("La hoja de precios no tiene columna de lote/unidad")
+    if not any(c.startswith('lista_') for c in df.columns):
+        raise ValueError("La hoja de precios no tiene columnas 'Lista N'")
+    if df['lote'].duplicated().any():
+        repetidos = sorted(df.loc[df['lote'].duplicated(), 'lote'].unique())
+        raise ValueError(f"Lotes repetidos en la hoja de precios: {repetidos}")
+
+def parsear_precios(file_name=ARCHIVO_PRECIOS):
+    """Lee y tipa el CSV en una sola pasada (sin snapshot)."""
+    df = pd.read_csv(file_name, header=_fila_encabezado(file_name), dtype=str)
+    df.columns = _normalizar_columnas(df.columns)
+    col_lote = next((c for c in df.columns if 'lote' in c or 'unidad' in c), None)
+    if col_lote is None:
+        raise ValueError("La hoja de precios no tiene columna de lote/unidad")
+    df = df.rename(columns={col_lote: 'lote'})
+    df['lote'] = pd.to_numeric(df['lote'], errors='coerce')
+    df = df.dropna(subset=['lote'])
+    df['lote'] = df['lote'].astype(int)
+    df = df[df['lote'] >= 1]
+    df = df.sort_values('lote', kind='stable').reset_index(drop=True)
+
+    col_status = next((c for c in df.columns if 'cliente' in c or 'estatus' in c), None)
+    if col_status:
+        s = df[col_status].astype('string').str.strip()
+        vendido = (s.notna() & ~s.isin(['', 'nan'])).to_numpy(dtype=bool)
+    else:
+        vendido = np.zeros(len(df), dtype=bool)
+    if os.path.abspath(file_name) == ARCHIVO_PRECIOS:
+        # Lotes 11-22 de Ananda Kino vendidos fuera de la hoja
+        vendido |= ((df['lote'] >= 11) & (df['lote'] <= 22)).to_numpy()
+
+    for c in df.columns:
+        if c == 'lote': continue
+        df[c] = limpiar_moneda(df[c]) if es_columna_numerica(c) else df[c].fillna('').astype(str)
+    df['status'] = np.where(vendido, 'Vendido', 'Disponible')
+    validar_esquema(df)
+    return df
+
+def _firma(file_name):
+    st_ = os.stat(file_name)
+    return st_.st_mtime_ns, st_.st_size
+
+def _hash(file_name):
+    h = hashlib.sha1()
+    with open(file_name, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _ruta_snapshot(file_name):
+    nombre = os.path.splitext(os.path.basename(file_name))[0]
+    clave = hashlib.sha1(os.path.abspath(file_name).encode()).hexdigest()[:8]
+    return os.path.join(CACHE_DIR, f"{nombre}-{clave}.npz")
+
+def _guardar_snapshot(ruta, df, firma, sha1):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    arreglos = {f"c{i}": (df[c].to_numpy() if pd.api.types.is_numeric_dtype(df[c]) else df[c].to_numpy(dtype=str)) for i, c in enumerate(df.columns)}
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, __columnas__=np.array(df.columns, dtype=str), __firma__=np.array(firma, dtype=np.int64),
+                 __sha1__=np.array(sha1), __version__=np.array(VERSION_SNAPSHOT), **arreglos)
+    os.replace(tmp, ruta)
+
+def _leer_snapshot(ruta, file_name):
+    """DataFrame del snapshot si sigue vigente para `file_name`; None en otro caso."""
+    try:
+        with np.load(ruta, allow_pickle=False) as z:
+            if int(z['__version__']) != VERSION_SNAPSHOT: return None
+            if tuple(z['__firma__'].tolist()) != _firma(file_name) and str(z['__sha1__']) != _hash(file_name): return None
+            columnas = z['__columnas__'].tolist()
+            return pd.DataFrame({c: z[f"c{i}"] for i, c in enumerate(columnas)})
+    except (OSError, KeyError, ValueError):
+        return None
+
+def leer_precios(file_name=ARCHIVO_PRECIOS, usar_snapshot=True):
+    """Hoja de precios tipada, usando el snapshot columnar si el CSV no ha cambiado."""
+    if not usar_snapshot:
+        return parsear_precios(file_name)
+    ruta = _ruta_snapshot(file_name)
+    df = _leer_snapshot(ruta, file_name)
+    contar("snapshot_aciertos" if df is not None else "snapshot_fallos")
+    if df is None:
+        firma = _firma(file_name)
+        df = parsear_precios(file_name)
+        try: _guardar_snapshot(ruta, df, firma, _hash(file_name))
+        except OSError: pass  # sin permisos de escritura: se trabaja sin snapshot
+    return df
+
+def inventario_default():
+    return pd.DataFrame({'lote': range(1, 45), 'status': ['Disponible']*44})
+
+def superficies(df):
+    """Arreglos (m2_terreno, m2_construccion) alineados con las filas de `df`."""
+    col_m2 = next((c for c in df.columns if 'm2' in c and 'privativo' in c), None) or next((c for c in df.columns if 'm2' in c), None)
+    m2_terreno = df[col_m2].to_numpy(dtype=float) if col_m2 else np.full(len(df), M2_TERRENO_DEFAULT)
+    col_const = next((c for c in df.columns if 'construccion' in c and 'total' in c), None)
+    m2_construccion = df[col_const].to_numpy(dtype=float) if col_const else np.full(len(df), M2_CONSTRUCCION_DEFAULT)
+    return m2_terreno, m2_construccion
@@ -0,0 +1,192 @@
+"""Gráficas de Plotly de la cotización, memoizadas como specs JSON.
+
+Construir una figura con Plotly Express/graph_objects (validación incluida) es
+de lo más caro de cada rerun. Aquí cada figura se construye una sola vez por
+combinación de entradas numéricas, se guarda serializada en un LRU acotado que
+comparten todas las sesiones del proceso y, en los aciertos, se rehidrata sin
+volver a validar.
+
+Sólo se usa `plotly.graph_objects`, que Streamlit ya importa; `plotly.express`
+(lo caro de importar en frío) no se carga nunca.
+"""
+import bisect
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+from metricas import medidor, tramo
+from proyeccion import proyectar_plusvalia, bandas_montecarlo, sensibilidad_renta, tornado_renta
+
+FIGURAS_CACHE_MAX = 256
+
+# --- COMPETENCIA (ordenada una sola vez por precio/m²) ---
+COMPETENCIA = sorted([
+    {"Proyecto": "Punta Península", "Precio": 4850000, "M2": 100, "Tipo": "Depto", "PrecioM2": 48500},
+    {"Proyecto": "HAX", "Precio": 3600000, "M2": 70, "Tipo": "Depto", "PrecioM2": 51428},
+    {"Proyecto": "Azaluma", "Precio": 4100000, "M2": 85, "Tipo": "Depto", "PrecioM2": 48235},
+], key=lambda c: c["PrecioM2"])
+_PRECIOS_M2_COMPETENCIA = [c["PrecioM2"] for c in COMPETENCIA]
+
+
+class CacheFiguras:
+    """LRU acotado {clave: spec JSON} con contadores de aciertos/fallos."""
+
+    def __init__(self, maxsize=FIGURAS_CACHE_MAX):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, construir):
+        with tramo(f"grafica_{clave[0]}"):
+            return self._obtener(clave, construir)
+
+    def _obtener(self, clave, construir):
+        with self._lock:
+            spec = self._specs.get(clave)
+            if spec is not None:
+                self._specs.move_to_end(clave)
+                self.hits += 1
+        if spec is None:
+            spec = construir().to_json()
+            with self._lock:
+                self.misses += 1
+                self._specs[clave] = spec
+                self._specs.move_to_end(clave)
+                while len(self._specs) > self.maxsize:
+                    self._specs.popitem(last=False)
+        # El spec ya se validó al construirlo: rehidratar sin validar cuesta ~1 ms contra ~40 ms de px
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def __len__(self):
+        return len(self._specs)
+
+cache_figuras = CacheFiguras()
+medidor("figuras_cache_aciertos", lambda: cache_figuras.hits)
+medidor("figuras_cache_fallos", lambda: cache_figuras.misses)
+
+def _clave(nombre, *valores):
+    return (nombre,) + tuple(round(float(v), 2) for v in valores)
+
+def comparativo_mercado(precio_final_venta, m2_construccion):
+    """Filas de la comparación de mercado (ANANDA + competencia) ya ordenadas por precio/m²."""
+    precio_m2_ananda = precio_final_venta / m2_construccion if m2_construccion > 0 else 0
+    ananda = {"Proyecto": "ANANDA", "Precio": precio_final_venta, "M2": m2_construccion, "Tipo": "Casa", "PrecioM2": precio_m2_ananda}
+    filas = list(COMPETENCIA)
+    filas.insert(bisect.bisect_left(_PRECIOS_M2_COMPETENCIA, precio_m2_ananda), ananda)
+    return filas
+
+def figura_mercado(precio_final_venta, m2_construccion):
+    def construir():
+        filas = comparativo_mercado(precio_final_venta, m2_construccion)
+        fig_bar = go.Figure(go.Bar(
+            x=[f["Proyecto"] for f in filas],
+            y=[f["PrecioM2"] for f in filas],
+            marker_color=['#28a745' if 'ANANDA' in f["Proyecto"] else '#ef553b' for f in filas],
+            text=[f"${f['PrecioM2']:,.0f}" for f in filas],
+            textposition='auto'
+        ))
+        fig_bar.update_layout(height=250, margin=dict(t=10,b=10), yaxis_title="$/m2")
+        return fig_bar
+    return cache_figuras.obtener(_clave("mercado", precio_final_venta, m2_construccion), construir)
+
+def figura_plusvalia(valor_inicial):
+    def construir():
+        # Áreas apiladas: valor de la casa y, encima, la renta acumulada
+        proy = proyectar_plusvalia(valor_inicial)
+        años = [p["Año"] for p in proy]
+        fig_area = go.Figure([
+            go.Scatter(x=años, y=[p[nombre] for p in proy], name=nombre, stackgroup='1', mode='lines', line=dict(color=color),
+                       hovertemplate=f"{nombre}<br>Año %{{x}}: $%{{y:,.0f}}<extra></extra>")
+            for nombre, color in (("Valor Propiedad", "#004e92"), ("Renta Acumulada", "#28a745"))
+        ])
+        fig_area.update_layout(title="Crecimiento Total (Valor Casa + Rentas)", xaxis_title="Año", yaxis_title="Valor $",
+                               plot_bgcolor='rgba(0,0,0,0)', legend_title_text='')
+        return fig_area
+    return cache_figuras.obtener(_clave("plusvalia", valor_inicial), construir)
+
+def figura_renta(neto_bolsillo, gasto_admin, gasto_servicios):
+    def construir():
+        fig_pie = go.Figure(data=[go.Pie(
+            labels=['Tu Ganancia', 'Comisión Admin', 'Servicios/Gastos'],
+            values=[neto_bolsillo, gasto_admin, gasto_servicios],
+            hole=.4,
+            marker_colors=['#28a745', '#ef553b', '#ffc107']
+        )])
+        fig_pie.update_layout(height=250, margin=dict(t=0,b=0,l=0,r=0))
+        return fig_pie
+    return cache_figuras.obtener(_clave("renta", neto_bolsillo, gasto_admin, gasto_servicios), construir)
+
+def figura_abanico(valor_inicial):
+    def construir():
+        bandas = bandas_montecarlo(valor_inicial)
+        años = bandas["años"]
+        fig_fan = go.Figure()
+        for nombre, color, relleno in (("Valor Propiedad", "#004e92", "rgba(0,78,146,0.18)"), ("Renta Acumulada", "#28a745", "rgba(40,167,69,0.18)")):
+            p10, p50, p90 = bandas[nombre]
+            fig_fan.add_trace(go.Scatter(x=años, y=p90, name=f"{nombre} P90", line=dict(width=0), showlegend=False))
+            fig_fan.add_trace(go.Scatter(x=años, y=p10, name=f"{nombre} P10-P90", line=dict(width=0), fill='tonexty', fillcolor=relleno))
+            fig_fan.add_trace(go.Scatter(x=años, y=p50, name=f"{nombre} P50", line=dict(color=color, width=3)))
+        fig_fan.update_layout(title="Escenarios de Crecimiento (P10 / P50 / P90)", plot_bgcolor='rgba(0,0,0,0)',
+                              legend_title_text='', hovermode='x unified')
+        return fig_fan
+    return cache_figuras.obtener(_clave("abanico", valor_inicial), construir)
+
+def figura_mapa_roi(precio_final_venta, gastos_fijos, admin_pct):
+    def construir():
+        sens = sensibilidad_renta(precio_final_venta, gastos_fijos)
+        k = int(abs(sens["comisiones"] - admin_pct).argmin())
+        fig_roi = go.Figure(go.Heatmap(
+            x=sens["tarifas"], y=sens["ocupaciones"] * 100, z=sens["roi"][:, :, k].T,
+            colorscale='RdYlGn', zmid=0, colorbar=dict(title="ROI %"),
+            hovertemplate="Tarifa $%{x:,.0f}<br>Ocupación %{y:.0f}%<br>ROI %{z:.1f}%<extra></extra>"
+        ))
+        fig_roi.update_layout(height=320, margin=dict(t=40,b=10), title=f"ROI % (comisión {sens['comisiones'][k]*100:.0f}%)",
+                              xaxis_title="Tarifa Noche ($)", yaxis_title="Ocupación %")
+        return fig_roi
+    return cache_figuras.obtener(_clave("mapa_roi", precio_final_venta, gastos_fijos, admin_pct), construir)
+
+def figura_equilibrio(gastos_fijos):
+    def construir():
+        # La ocupación de equilibrio no depende del precio de la casa
+        sens = sensibilidad_renta(1.0, gastos_fijos)
+        fig_eq = go.Figure(go.Heatmap(
+            x=sens["tarifas"], y=sens["comisiones"] * 100, z=(sens["ocupacion_equilibrio"] * 100).T,
+            colorscale='RdYlGn_r', zmin=0, zmax=100, colorbar=dict(title="Ocup. %"),
+            hovertemplate="Tarifa $%{x:,.0f}<br>Comisión %{y:.0f}%<br>Equilibrio %{z:.1f}%<extra></extra>"
+        ))
+        fig_eq.update_layout(height=320, margin=dict(t=40,b=10), title="Ocupación de Equilibrio (utilidad = 0)",
+                             xaxis_title="Tarifa Noche ($)", yaxis_title="Comisión Admin %")
+        return fig_eq
+    return cache_figuras.obtener(_clave("equilibrio", gastos_fijos), construir)
+
+def figura_tornado(precio_final_venta, tarifa, ocupacion, admin_pct, gastos_fijos):
+    def construir():
+        filas, roi_base = tornado_renta(precio_final_venta, tarifa, ocupacion, admin_pct, gastos_fijos)
+        filas = filas[::-1]  # la barra más larga arriba
+        nombres = [f[0] for f in filas]
+        fig_tor = go.Figure([
+            go.Bar(y=nombres, x=[f[1] - roi_base for f in filas], base=roi_base, orientation='h', name="-20%", marker_color='#ef553b'),
+            go.Bar(y=nombres, x=[f[2] - roi_base for f in filas], base=roi_base, orientation='h', name="+20%", marker_color='#28a745'),
+        ])
+        fig_tor.update_layout(height=250, margin=dict(t=40,b=10), barmode='overlay', title=f"Sensibilidad del ROI (base {roi_base:.1f}%)",
+                              xaxis_title="ROI %", legend_title_text='')
+        return fig_tor
+    return cache_figuras.obtener(_clave("tornado", precio_final_venta, tarifa, ocupacion, admin_pct, gastos_fijos), construir)
+
+def figura_pareto(precios_frontera, enganches_frontera, precio_actual, enganche_actual):
+    """Frontera de Pareto precio final vs enganche del optimizador, con la cotización actual marcada."""
+    def construir():
+        fig = go.Figure([
+            go.Scatter(x=list(enganches_frontera), y=list(precios_frontera), name="Planes no dominados", mode='lines+markers',
+                       line=dict(color='#004e92', shape='hv'), hovertemplate="Enganche $%{x:,.0f}<br>Precio final $%{y:,.0f}<extra></extra>"),
+            go.Scatter(x=[enganche_actual], y=[precio_actual], name="Cotización actual", mode='markers',
+                       marker=dict(color='#ef553b', size=12, symbol='star'), hovertemplate="Enganche $%{x:,.0f}<br>Precio final $%{y:,.0f}<extra></extra>"),
+        ])
+        fig.update_layout(height=320, margin=dict(t=30, b=10), title="Precio final vs enganche", xaxis_title="Enganche total $",
+                          yaxis_title="Precio final $", plot_bgcolor='rgba(0,0,0,0)', legend_title_text='')
+        return fig
+    return cache_figuras.obtener(_clave("pareto", precio_actual, enganche_actual, *precios_frontera, *enganches_frontera), construir)
@@ -0,0 +1,114 @@
+"""Inventario de lotes compartido entre sesiones (SQLite en modo WAL).
+
+El estado de cada lote vive en una tabla con (desarrollo, lote) como llave
+primaria; apartar/vender/liberar son UPDATE condicionales dentro de una
+transacción, así que dos asesores no pueden quedarse con el mismo lote. Cada
+escritura incrementa un contador de versión que las sesiones consultan para
+enterarse de cambios sin volver a leer la hoja de precios.
+
+Las conexiones son por hilo. Streamlit corre cada rerun en un hilo de script
+nuevo, así que en la app cada rerun abre la suya (abrir un archivo SQLite local
+cuesta menos de un milisegundo); el servicio HTTP consulta desde el hilo del
+event loop y conserva una sola.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+ARCHIVO_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventario.db")
+DISPONIBLE, APARTADO, VENDIDO = 'Disponible', 'Apartado', 'Vendido'
+ESTADOS = (DISPONIBLE, APARTADO, VENDIDO)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS lotes (
+    desarrollo TEXT NOT NULL,
+    lote INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Disponible',
+    asesor TEXT NOT NULL DEFAULT '',
+    cliente TEXT NOT NULL DEFAULT '',
+    actualizado TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (desarrollo, lote)
+);
+CREATE INDEX IF NOT EXISTS idx_lotes_status ON lotes(desarrollo, status);
+CREATE TABLE IF NOT EXISTS version (id INTEGER PRIMARY KEY CHECK (id = 1), n INTEGER NOT NULL);
+INSERT OR IGNORE INTO version (id, n) VALUES (1, 0);
+"""
+
+
+class Inventario:
+    """Acceso al inventario; una conexión SQLite por hilo (sqlite3 no comparte conexiones entre hilos)."""
+
+    def __init__(self, ruta=ARCHIVO_DB):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._conexion().executescript(_ESQUEMA)
+
+    def _conexion(self):
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=10, isolation_level=None)
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def _escribir(self, sql, params):
+        """Ejecuta un UPDATE condicional; regresa True si afectó una fila."""
+        con = self._conexion()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            ok = con.execute(sql, params).rowcount == 1
+            if ok: con.execute("UPDATE version SET n = n + 1 WHERE id = 1")
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        return ok
+
+    def sembrar(self, desarrollo, lotes, estados):
+        """Da de alta los lotes que aún no existen; los que ya están conservan su estado."""
+        con = self._conexion()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            nuevos = con.executemany("INSERT OR IGNORE INTO lotes (desarrollo, lote, status) VALUES (?, ?, ?)",
+                                     ((desarrollo, int(l), str(s)) for l, s in zip(lotes, estados))).rowcount
+            if nuevos > 0: con.execute("UPDATE version SET n = n + 1 WHERE id = 1")
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def version(self):
+        return self._conexion().execute("SELECT n FROM version WHERE id = 1").fetchone()[0]
+
+    def lote(self, desarrollo, lote):
+        fila = self._conexion().execute("SELECT * FROM lotes WHERE desarrollo = ? AND lote = ?", (desarrollo, int(lote))).fetchone()
+        return dict(fila) if fila else None
+
+    def estados(self, desarrollo):
+        """{lote: status} de todo el desarrollo."""
+        return dict(self._conexion().execute("SELECT lote, status FROM lotes WHERE desarrollo = ? ORDER BY lote", (desarrollo,)).fetchall())
+
+    def lotes_con_status(self, desarrollo, status):
+        return [f[0] for f in self._conexion().execute(
+            "SELECT lote FROM lotes WHERE desarrollo = ? AND status = ? ORDER BY lote", (desarrollo, status))]
+
+    def reservar(self, desarrollo, lote, asesor, cliente=''):
+        return self._escribir(
+            "UPDATE lotes SET status = ?, asesor = ?, cliente = ?, actualizado = ? WHERE desarrollo = ? AND lote = ? AND status = ?",
+            (APARTADO, asesor, cliente, datetime.now().isoformat(timespec='seconds'), desarrollo, int(lote), DISPONIBLE))
+
+    def vender(self, desarrollo, lote, asesor, cliente=''):
+        # Un lote apartado sólo lo puede vender el asesor que lo apartó
+        return self._escribir(
+            "UPDATE lotes SET status = ?, asesor = ?, cliente = ?, actualizado = ? "
+            "WHERE desarrollo = ? AND lote = ? AND (status = ? OR (status = ? AND asesor = ?))",
+            (VENDIDO, asesor, cliente, datetime.now().isoformat(timespec='seconds'), desarrollo, int(lote), DISPONIBLE, APARTADO, asesor))
+
+    def liberar(self, desarrollo, lote, asesor):
+        return self._escribir(
+            "UPDATE lotes SET status = ?, asesor = '', cliente = '', actualizado = ? "
+            "WHERE desarrollo = ? AND lote = ? AND status = ? AND asesor = ?",
+            (DISPONIBLE, datetime.now().isoformat(timespec='seconds'), desarrollo, int(lote), APARTADO, asesor))
@@ -0,0 +1,84 @@
+"""Memoria residente del proceso de Streamlit según el número de sesiones abiertas.
+
+Abre hasta `--sesiones` sesiones headless de app.py (AppTest) en este mismo proceso,
+todas vivas a la vez como en un servidor con muchos asesores conectados, y reporta
+el RSS en cada punto de control y los KB que agrega cada sesión nueva:
+
+    python memoria_sesiones.py --sesiones 200
+    python memoria_sesiones.py --sesiones 50 --puntos 1 10 25 50
+
+Cada sesión cambia de lote y de lista para no quedarse en la cotización por defecto.
+AppTest también guarda el árbol de elementos de cada sesión, así que el costo absoluto
+por sesión es una cota superior; lo útil es comparar corridas entre versiones.
+"""
+import argparse
+import gc
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+PUNTOS_DEFAULT = (1, 10, 25, 50, 100, 150, 200)
+
+
+def rss_mb():
+    """RSS actual en MB (VmRSS de /proc; si no existe, el máximo de getrusage)."""
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / (1024 * 1024) if sys.platform == "darwin" else maximo / 1024
+
+def _selector(at, etiqueta):
+    return next(s for s in at.sidebar.selectbox if s.label == etiqueta)
+
+def abrir_sesion(i):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=120)
+    at.run()
+    # El selector de lote muestra "Lote N (Estatus)" pero su valor es el número de lote
+    lote = _selector(at, "Lote:")
+    lote.set_value(int(lote.options[i % len(lote.options)].split()[1])).run()
+    lista = _selector(at, "Lista de Precio:")
+    lista.set_value(i % len(lista.options) + 1).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSS del proceso por número de sesiones de app.py abiertas.")
+    parser.add_argument("--sesiones", type=int, default=200)
+    parser.add_argument("--puntos", type=int, nargs="+", help="Puntos de control (default: 1 10 25 50 100 150 200)")
+    args = parser.parse_args(argv)
+    puntos = sorted({p for p in (args.puntos or PUNTOS_DEFAULT) if p <= args.sesiones} | {args.sesiones})
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    # Las cotizaciones de estas sesiones no van a la bitácora de auditoría real
+    os.environ["ANANDA_AUDITORIA"] = tempfile.mkdtemp(prefix="auditoria_memoria_")
+    base = rss_mb()
+    print(f"RSS antes de abrir sesiones: {base:,.1f} MB")
+    print(f"{'sesiones':>8} {'RSS MB':>9} {'Δ MB':>8} {'KB/sesión (tramo)':>18} {'s':>7}")
+    sesiones, medidas = [], []
+    inicio = time.perf_counter()
+    for n in puntos:
+        while len(sesiones) < n:
+            sesiones.append(abrir_sesion(len(sesiones)))
+        gc.collect()
+        rss = rss_mb()
+        tramo = f"{(rss - medidas[-1][1]) * 1024 / (n - medidas[-1][0]):,.0f}" if medidas else "-"
+        print(f"{n:8d} {rss:9.1f} {rss - base:8.1f} {tramo:>18} {time.perf_counter() - inicio:7.1f}")
+        medidas.append((n, rss))
+    if len(medidas) > 1:
+        (n0, rss0), (n1, rss1) = medidas[0], medidas[-1]
+        print(f"Promedio de la sesión {n0 + 1} a la {n1}: {(rss1 - rss0) * 1024 / (n1 - n0):,.0f} KB/sesión")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
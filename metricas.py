@@ -0,0 +1,118 @@
+"""Tramos de tiempo y contadores del proceso, exportables en formato de texto de Prometheus.
+
+    with tramo("cotizacion"): ...          # suma la duración al histograma "cotizacion"
+    @medido("pdf")                         # lo mismo para cada llamada a la función
+    contar("pdf_bytes", len(pdf))          # contador monotónico
+    medidor("figuras_cache_aciertos", fn)  # valor que se lee al exportar
+
+Los registros son del proceso (los comparten todas las sesiones de Streamlit y los
+hilos del servicio). Además, `iniciar_corrida()` abre un registro por ejecución del
+script para el panel de `?profile=1`: cada tramo medido en ese hilo se suma ahí.
+"""
+import bisect
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIJO = "ananda"
+# Si está definida, app.py reescribe este archivo .prom al final de cada corrida
+ARCHIVO_PROMETHEUS = os.environ.get("ANANDA_METRICAS")
+# Límites de los buckets del histograma de tramos (segundos)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_tramos = {}     # nombre -> [conteo, suma_s, máx_s, [conteo por bucket]]
+_contadores = {}
+_medidores = {}
+_corrida = contextvars.ContextVar("corrida", default=None)
+
+
+def iniciar_corrida():
+    """Registro {tramo: ms} de esta ejecución del script (hilo actual)."""
+    registro = {}
+    _corrida.set(registro)
+    return registro
+
+def registrar(nombre, segundos):
+    with _lock:
+        t = _tramos.get(nombre)
+        if t is None:
+            t = _tramos[nombre] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+        t[0] += 1
+        t[1] += segundos
+        t[2] = max(t[2], segundos)
+        i = bisect.bisect_left(BUCKETS, segundos)
+        if i < len(BUCKETS): t[3][i] += 1
+    registro = _corrida.get()
+    if registro is not None:
+        registro[nombre] = registro.get(nombre, 0.0) + segundos * 1000
+
+@contextmanager
+def tramo(nombre):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(nombre, time.perf_counter() - inicio)
+
+def medido(nombre):
+    """Decorador: cada llamada a la función es un tramo `nombre`."""
+    def decorador(fn):
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            with tramo(nombre):
+                return fn(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def contar(nombre, n=1):
+    with _lock:
+        _contadores[nombre] = _contadores.get(nombre, 0) + n
+
+def medidor(nombre, fn):
+    """Registra un valor calculado al exportar (p. ej. los aciertos de un caché)."""
+    _medidores[nombre] = fn
+
+def resumen():
+    """{tramo: (conteo, promedio_ms, máx_ms)} acumulado del proceso."""
+    with _lock:
+        return {n: (t[0], t[1] / t[0] * 1000, t[2] * 1000) for n, t in sorted(_tramos.items())}
+
+def contadores():
+    with _lock:
+        valores = dict(_contadores)
+    valores.update({n: fn() for n, fn in _medidores.items()})
+    return dict(sorted(valores.items()))
+
+def prometheus():
+    """Tramos, contadores y medidores en formato de texto de Prometheus (0.0.4)."""
+    with _lock:
+        tramos = {n: (t[0], t[1], list(t[3])) for n, t in sorted(_tramos.items())}
+        cuentas = dict(sorted(_contadores.items()))
+    lineas = []
+    if tramos:
+        h = f"{PREFIJO}_tramo_segundos"
+        lineas += [f"# HELP {h} Duración de cada tramo de la app.", f"# TYPE {h} histogram"]
+        for nombre, (conteo, suma, buckets) in tramos.items():
+            acumulado = 0
+            for limite, n in zip(BUCKETS, buckets):
+                acumulado += n
+                lineas.append(f'{h}_bucket{{tramo="{nombre}",le="{limite}"}} {acumulado}')
+            lineas.append(f'{h}_bucket{{tramo="{nombre}",le="+Inf"}} {conteo}')
+            lineas.append(f'{h}_sum{{tramo="{nombre}"}} {suma:.6f}')
+            lineas.append(f'{h}_count{{tramo="{nombre}"}} {conteo}')
+    for nombre, valor in cuentas.items():
+        lineas += [f"# TYPE {PREFIJO}_{nombre}_total counter", f"{PREFIJO}_{nombre}_total {valor}"]
+    for nombre, fn in sorted(_medidores.items()):
+        lineas += [f"# TYPE {PREFIJO}_{nombre} gauge", f"{PREFIJO}_{nombre} {fn()}"]
+    return "\n".join(lineas) + "\n"
+
+def escribir_prometheus(ruta):
+    """Escribe `prometheus()` de forma atómica (para el textfile collector de node_exporter)."""
+    tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus())
+    os.replace(tmp, ruta)
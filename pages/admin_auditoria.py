@@ -0,0 +1,68 @@
+"""Consulta de la bitácora de auditoría: cotizaciones y PDFs por lote, asesor y fecha.
+
+La página pide la clave de ANANDA_ADMIN_CLAVE antes de mostrar nada; si la variable
+no está definida, queda bloqueada (la liga aparece en la barra lateral de todos).
+"""
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from auditoria import Auditoria, COTIZACION, EVENTOS, PDF, inicio_semana
+from datos import DESARROLLO_DEFAULT, desarrollos
+
+st.set_page_config(page_title="Ananda Kino | Auditoría", page_icon="📋", layout="wide")
+st.title("📋 Auditoría de cotizaciones")
+
+clave = os.environ.get("ANANDA_ADMIN_CLAVE")
+if not clave:
+    st.error("La consulta de auditoría está deshabilitada: define ANANDA_ADMIN_CLAVE en el servidor.")
+    st.stop()
+if st.sidebar.text_input("Clave de administrador:", type="password") != clave:
+    st.info("Captura la clave de administrador para consultar la bitácora.")
+    st.stop()
+
+# Sólo consultas: el escritor de fondo vive en la instancia de app.py
+bitacora = Auditoria()
+
+f1, f2, f3, f4, f5 = st.columns([2, 2, 1, 2, 1])
+rango = f1.date_input("Fechas:", (inicio_semana(), date.today()), max_value=date.today())
+hojas = list(desarrollos())
+desarrollo = f2.selectbox("Desarrollo:", hojas) if len(hojas) > 1 else DESARROLLO_DEFAULT
+lote = f3.number_input("Lote:", 0, value=0, help="0 = todos")
+asesor = f4.text_input("Asesor:").strip()
+evento = f5.selectbox("Evento:", ("Todos",) + EVENTOS)
+if len(rango) != 2:
+    st.stop()
+desde, hasta = rango
+filtros = dict(desarrollo=desarrollo, lote=int(lote) or None, asesor=asesor or None, evento=None if evento == "Todos" else evento)
+
+por_evento = bitacora.conteo("evento", desde, hasta, **{**filtros, "evento": None})
+m1, m2, m3 = st.columns(3)
+m1.metric("Cotizaciones", f"{por_evento.get(COTIZACION, 0):,}")
+m2.metric("PDFs descargados", f"{por_evento.get(PDF, 0):,}")
+m3.metric("Días", (hasta - desde).days + 1)
+
+c1, c2 = st.columns(2)
+with c1:
+    st.subheader("Por lote")
+    por_lote = bitacora.conteo("lote", desde, hasta, **filtros)
+    if por_lote: st.bar_chart(pd.Series(por_lote, name="registros").rename_axis("lote"))
+    else: st.caption("Sin registros en el rango.")
+with c2:
+    st.subheader("Por asesor")
+    por_asesor = bitacora.conteo("asesor", desde, hasta, **filtros)
+    st.dataframe(pd.Series(por_asesor, name="registros").rename_axis("asesor").sort_values(ascending=False), use_container_width=True)
+
+st.subheader("Por día")
+por_dia = bitacora.conteo("dia", desde, hasta, **filtros)
+if por_dia: st.line_chart(pd.Series(por_dia, name="registros").rename_axis("día"))
+
+st.subheader("Registros recientes")
+registros = pd.DataFrame(bitacora.registros(desde, hasta, **filtros, limite=500))
+st.dataframe(registros, hide_index=True, use_container_width=True, column_config={
+    **{col: st.column_config.NumberColumn(format="dollar") for col in ("precio_final", "monto_enganche", "mensualidad")},
+})
+if not registros.empty:
+    st.download_button("Descargar CSV", registros.to_csv(index=False), file_name=f"auditoria_{desde}_{hasta}.csv", mime="text/csv")
@@ -0,0 +1,244 @@
+"""Generador del PDF de cotización de Ananda Kino."""
+import os
+from datetime import date
+from functools import lru_cache
+
+from amortizacion import COLUMNAS_TABLA, resumen_credito, tabla_credito
+from metricas import contar, medido, medidor
+
+LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
+# Cotizaciones distintas que se guardan ya renderizadas (por proceso)
+PDF_CACHE_MAX = 128
+
+# Campos que `create_pdf` espera en el dict de cotización
+CAMPOS_PDF = (
+    "cliente_nombre",
+    "asesor_nombre",
+    "num_lote_selec",
+    "m2_terreno",
+    "precio_lista_base",
+    "descuento_pct",
+    "monto_descuento",
+    "precio_final_venta",
+    "precio_futuro_lista10",  # None: desarrollo sin precio a la entrega (no se imprime la plusvalía)
+    "enganche_pct",
+    "monto_enganche",
+    "plazo_meses",
+    "mensualidad",
+    "saldo_final",
+    "plusvalia_preventa",
+    "valor_final_5y",
+    "neto_bolsillo_est",
+    "roi_renta",
+    "credito",  # None o (tasa_anual, meses, esquema, abono_anual) para financiar el saldo final
+)
+
+
+@lru_cache(maxsize=1)
+def _logo():
+    # Decodificar el PNG es lo más caro del PDF: se hace una vez por proceso. Este caché y el de
+    # `header` son el único uso de la API privada de FPDF (`_parsepng`, `images`); por eso
+    # requirements.txt fija fpdf==1.7.2
+    from fpdf import FPDF
+    return FPDF()._parsepng(LOGO)
+
+@lru_cache(maxsize=1)
+def clase_pdf():
+    """Subclase de FPDF con el encabezado y pie de Ananda; fpdf se importa hasta el primer PDF."""
+    from fpdf import FPDF
+
+    class PDF(FPDF):
+        def header(self):
+            # LOGO GRANDE (60 de ancho)
+            try:
+                if LOGO not in self.images:
+                    # Copia: FPDF borra 'data' del dict al escribir el documento
+                    self.images[LOGO] = dict(_logo(), i=len(self.images) + 1)
+                    # Transparencia (canal alfa): lo mismo que haría FPDF al parsear el PNG
+                    if 'smask' in self.images[LOGO] and self.pdf_version < '1.4': self.pdf_version = '1.4'
+                self.image(LOGO, 10, 8, 60)
+            except: pass
+        
+            self.set_y(15)
+            self.set_font('Arial', 'B', 16)
+            self.set_text_color(0, 78, 146)
+            self.cell(0, 10, 'COTIZACION PREVENTA ANANDA', 0, 1, 'R')
+        
+            # WEB
+            self.set_font('Arial', '', 10)
+            self.set_text_color(100)
+            self.cell(0, 5, 'www.anandakino.mx', 0, 1, 'R', link='https://www.anandakino.mx')
+            self.ln(15)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('Arial', 'I', 8)
+            self.set_text_color(128)
+            self.cell(0, 10, f'Ananda Kino | {date.today().strftime("%d/%m/%Y")} | Pagina {self.page_no()}', 0, 0, 'C')
+
+    return PDF
+
+def tabla_pdf(pdf, anchos, alineaciones, filas, alto):
+    """Filas de texto con borde: una `cell` por columna y salto de línea al final de cada fila."""
+    ultima = len(anchos) - 1
+    for fila in filas:
+        for i, (txt, w, a) in enumerate(zip(fila, anchos, alineaciones)):
+            pdf.cell(w, alto, txt, 1, 1 if i == ultima else 0, a)
+
+@medido("pdf")
+def create_pdf(c):
+    """PDF de la cotización `c` (dict con las llaves de CAMPOS_PDF) como bytes."""
+    (cliente_nombre, asesor_nombre, num_lote_selec, m2_terreno, precio_lista_base, descuento_pct,
+     monto_descuento, precio_final_venta, precio_futuro_lista10, enganche_pct, monto_enganche,
+     plazo_meses, mensualidad, saldo_final, plusvalia_preventa, valor_final_5y, neto_bolsillo_est,
+     roi_renta, credito) = (c[k] for k in CAMPOS_PDF)
+    pdf = clase_pdf()()
+    pdf.set_auto_page_break(auto=True, margin=10)
+    pdf.add_page()
+    
+    # 1. HEADER
+    pdf.set_font('Arial', '', 11)
+    pdf.set_text_color(50)
+    pdf.cell(100, 6, f'Cliente: {cliente_nombre if cliente_nombre else "_________________"}', 0, 0)
+    pdf.cell(0, 6, f'Fecha: {date.today().strftime("%d/%m/%Y")}', 0, 1, 'R')
+    pdf.cell(100, 6, f'Asesor: {asesor_nombre if asesor_nombre else "_________________"}', 0, 0)
+    pdf.set_font('Arial', 'B', 11)
+    pdf.set_text_color(0, 78, 146)
+    pdf.cell(0, 6, f'LOTE {num_lote_selec} ({m2_terreno:.0f}m2)', 0, 1, 'R')
+    pdf.ln(5)
+
+    # 2. BLOQUE AZUL: DATOS FINANCIEROS
+    pdf.set_fill_color(240, 248, 255) # Azul muy claro
+    pdf.rect(10, pdf.get_y(), 190, 40, 'F')
+    pdf.set_y(pdf.get_y() + 5)
+    
+    pdf.set_font('Arial', '', 11)
+    pdf.set_text_color(0)
+    pdf.cell(100, 7, 'Precio de Lista:', 0, 0, 'L')
+    pdf.cell(80, 7, f"${precio_lista_base:,.2f}", 0, 1, 'R')
+    
+    pdf.set_text_color(220, 53, 69)
+    pdf.cell(100, 7, f'Descuento ({descuento_pct*100:.1f}%):', 0, 0, 'L')
+    pdf.cell(80, 7, f"-${monto_descuento:,.2f}", 0, 1, 'R')
+    
+    pdf.set_text_color(0, 78, 146)
+    pdf.set_font('Arial', 'B', 14)
+    pdf.cell(100, 10, 'PRECIO FINAL:', 0, 0, 'L')
+    pdf.cell(80, 10, f"${precio_final_venta:,.2f}", 0, 1, 'R')
+    
+    pdf.set_text_color(0)
+    pdf.set_font('Arial', '', 10)
+    if precio_futuro_lista10 is not None:
+        pdf.cell(100, 6, 'Precio a la Entrega (Lista 10):', 0, 0, 'L')
+        pdf.cell(80, 6, f"${precio_futuro_lista10:,.2f}", 0, 1, 'R')
+    pdf.ln(5)
+
+    # 3. PLAN DE PAGO
+    pdf.set_font('Arial', 'B', 12)
+    pdf.set_text_color(0)
+    pdf.cell(0, 10, 'PLAN DE INVERSION', 0, 1, 'L')
+    
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(100, 7, f'Enganche ({enganche_pct}%):', 0, 0)
+    pdf.cell(80, 7, f"${monto_enganche:,.2f}", 0, 1, 'R')
+    
+    if plazo_meses > 0:
+        pdf.set_font('Arial', 'B', 11)
+        pdf.cell(100, 7, f'Mensualidad ({plazo_meses} pagos):', 0, 0)
+        pdf.cell(80, 7, f"${mensualidad:,.2f}", 0, 1, 'R')
+    
+    pdf.set_font('Arial', '', 11)
+    pdf.cell(100, 7, 'Saldo Final (Verano 2027):', 0, 0)
+    pdf.cell(80, 7, f"${saldo_final:,.2f}", 0, 1, 'R')
+    
+    # 4. TABLA DE AMORTIZACION
+    if plazo_meses > 0:
+        pdf.ln(10)
+        pdf.set_font('Arial', 'B', 11)
+        pdf.set_fill_color(0, 78, 146)
+        pdf.set_text_color(255)
+        pdf.cell(20, 8, '#', 1, 0, 'C', 1)
+        pdf.cell(110, 8, 'Concepto', 1, 0, 'C', 1)
+        pdf.cell(60, 8, 'Monto', 1, 1, 'C', 1)
+        
+        pdf.set_font('Arial', '', 10)
+        pdf.set_text_color(0)
+        monto = f"${mensualidad:,.2f}"
+        tabla_pdf(pdf, (20, 110, 60), "CLR", [(str(i), 'Mensualidad Enganche', monto) for i in range(1, plazo_meses + 1)], 8)
+
+    # 5. LIQUIDACION
+    pdf.ln(10)
+    pdf.set_fill_color(44, 62, 80)
+    pdf.set_text_color(255)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 12, f' LIQUIDACION FINAL: ${saldo_final:,.2f} (VERANO 2027)', 0, 1, 'C', 1)
+
+    # 5b. FINANCIAMIENTO DE LA LIQUIDACION
+    if credito:
+        tasa_anual, meses, esquema, abono_anual = credito
+        tabla = tabla_credito(saldo_final, credito)
+        res = resumen_credito(tabla)
+        pdf.ln(6)
+        pdf.set_text_color(0, 78, 146)
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 8, f'FINANCIAMIENTO DE LA LIQUIDACION ({esquema.upper()}, {tasa_anual*100:.2f}% ANUAL)', 0, 1, 'L')
+        pdf.set_text_color(0)
+        pdf.set_font('Arial', '', 10)
+        pdf.cell(100, 6, f"Pagos ({res['meses']} de {meses} meses):", 0, 0)
+        pdf.cell(80, 6, f"${res['primer_pago']:,.2f}" + (f" a ${res['ultimo_pago']:,.2f}" if abs(res['ultimo_pago'] - res['primer_pago']) >= 0.01 else ""), 0, 1, 'R')
+        if abono_anual > 0:
+            pdf.cell(100, 6, "Abono extra anual:", 0, 0)
+            pdf.cell(80, 6, f"${abono_anual:,.2f}", 0, 1, 'R')
+        pdf.cell(100, 6, "Total de Intereses:", 0, 0)
+        pdf.cell(80, 6, f"${res['total_intereses']:,.2f}", 0, 1, 'R')
+        pdf.ln(3)
+        anchos = (15, 35, 35, 35, 35, 35)
+        pdf.set_font('Arial', 'B', 9)
+        pdf.set_fill_color(0, 78, 146)
+        pdf.set_text_color(255)
+        for titulo, w in zip(('#', 'Pago', 'Interes', 'Capital', 'Abono', 'Saldo'), anchos):
+            pdf.cell(w, 7, titulo, 1, 0, 'C', 1)
+        pdf.ln()
+        pdf.set_font('Arial', '', 8)
+        pdf.set_text_color(0)
+        columnas = [tabla["mes"].astype(str)] + [[f"${v:,.2f}" for v in tabla[col].tolist()] for col in COLUMNAS_TABLA[1:]]
+        tabla_pdf(pdf, anchos, "CRRRRR", list(zip(*columnas)), 5)
+    
+    # 6. NEGOCIO & LEGAL
+    pdf.ln(8)
+    pdf.set_text_color(0, 78, 146)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 8, 'PROYECCION DE NEGOCIO', 0, 1, 'L')
+    pdf.set_text_color(0)
+    pdf.set_font('Arial', '', 10)
+    if plusvalia_preventa is not None:
+        pdf.cell(100, 6, "Plusvalia a la Entrega:", 0, 0)
+        pdf.set_text_color(40, 167, 69)
+        pdf.cell(80, 6, f"+${plusvalia_preventa:,.2f}", 0, 1, 'R')
+        pdf.set_text_color(0)
+    pdf.cell(100, 6, "Valor Proyectado (5 Anios):", 0, 0)
+    pdf.cell(80, 6, f"${valor_final_5y:,.2f}", 0, 1, 'R')
+    pdf.cell(100, 6, "Utilidad Renta Anual Estimada:", 0, 0)
+    pdf.cell(80, 6, f"${neto_bolsillo_est:,.2f} (ROI {roi_renta:.1f}%)", 0, 1, 'R')
+    
+    # Disclaimer
+    pdf.ln(5)
+    pdf.set_font('Arial', 'I', 8)
+    pdf.set_text_color(100)
+    pdf.multi_cell(0, 5, "Nota: Precios sujetos a cambios sin previo aviso. Las proyecciones son estimadas y no garantizan rendimientos futuros.", 0, 'C')
+
+    datos = pdf.output(dest='S').encode('latin-1', 'replace')
+    contar("pdfs_generados")
+    contar("pdf_bytes", len(datos))
+    return datos
+
+@lru_cache(maxsize=PDF_CACHE_MAX)
+def _create_pdf_cacheado(valores, dia):
+    return create_pdf(dict(zip(CAMPOS_PDF, valores)))
+
+def pdf_cotizacion(c):
+    """`create_pdf` memoizado por las cifras de la cotización y la fecha del pie de página."""
+    return _create_pdf_cacheado(tuple(c[k] for k in CAMPOS_PDF), date.today())
+
+medidor("pdf_cache_aciertos", lambda: _create_pdf_cacheado.cache_info().hits)
+medidor("pdf_cache_fallos", lambda: _create_pdf_cacheado.cache_info().misses)
@@ -0,0 +1,152 @@
+"""Generación masiva de cotizaciones en PDF.
+
+Lee un CSV de clientes con columnas `cliente, asesor, lote, lista, enganche, plazo`
+(todas opcionales salvo `cliente` y `lote`; también acepta los supuestos del
+simulador de rentas `tarifa, ocupacion, admin, gastos_fijos`, en % como en la
+app, y el financiamiento del saldo final `plazo_credito` (meses, 0 = sin crédito),
+`tasa_credito` (% anual), `esquema_credito` (Francés/Alemán) y `abono_credito`
+(abono extra anual)), calcula todas las
+cotizaciones en una sola pasada vectorizada, reparte el render de los PDFs entre
+procesos y va escribiendo cada documento al ZIP conforme termina.
+
+    python pdf_lote.py clientes.csv -o cotizaciones.zip -j 4
+"""
+import argparse
+import re
+import sys
+import time
+import zipfile
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from cotizador import NUM_LISTAS, OPCIONES_PLAZO, PRECIO_FUTURO_LISTA10, matriz_precios, cotizar
+from datos import ARCHIVO_PRECIOS, leer_precios, superficies
+from proyeccion import proyectar_plusvalia, simular_renta, TARIFA_DEFAULT, OCUPACION_DEFAULT, ADMIN_DEFAULT, GASTOS_FIJOS_DEFAULT
+from amortizacion import ESQUEMAS, FRANCES, PLAZO_CREDITO_MIN, PLAZO_CREDITO_MAX, TASA_CREDITO_DEFAULT
+from pdf_cotizacion import create_pdf
+
+COLUMNAS_DEFAULT = {
+    "asesor": "", "lista": 1, "enganche": 30, "plazo": 12,
+    "tarifa": TARIFA_DEFAULT, "ocupacion": OCUPACION_DEFAULT * 100, "admin": ADMIN_DEFAULT * 100, "gastos_fijos": GASTOS_FIJOS_DEFAULT,
+    "plazo_credito": 0, "tasa_credito": TASA_CREDITO_DEFAULT * 100, "esquema_credito": FRANCES, "abono_credito": 0,
+}
+# Columnas de texto (el resto se convierte a número)
+COLUMNAS_TEXTO = ("asesor", "esquema_credito")
+
+
+def preparar_cotizaciones(clientes, df, precio_futuro=PRECIO_FUTURO_LISTA10):
+    """Lista de dicts listos para `create_pdf`, uno por fila de `clientes`.
+
+    `precio_futuro` es el precio a la entrega del desarrollo de `df` (`datos.PRECIOS_FUTUROS`);
+    con None se dejan vacías las cifras de plusvalía, igual que en app.py.
+    """
+    faltantes = [c for c in ("cliente", "lote") if c not in clientes.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el CSV de clientes: {', '.join(faltantes)}")
+    for col, default in COLUMNAS_DEFAULT.items():
+        if col not in clientes.columns: clientes[col] = default
+        elif col not in COLUMNAS_TEXTO: clientes[col] = pd.to_numeric(clientes[col], errors='coerce').fillna(default)
+    clientes["asesor"] = clientes["asesor"].fillna("").astype(str)
+    clientes["esquema_credito"] = clientes["esquema_credito"].fillna(FRANCES).astype(str)
+    clientes["cliente"] = clientes["cliente"].fillna("").astype(str)
+
+    for col, lo, hi in (("lista", 1, NUM_LISTAS), ("enganche", 0, 100), ("plazo", 0, max(OPCIONES_PLAZO))):
+        fuera = ~clientes[col].between(lo, hi)
+        if fuera.any():
+            raise ValueError(f"'{col}' fuera de rango ({lo}-{hi}): {sorted(set(clientes[col][fuera].tolist()))}")
+    con_credito = clientes["plazo_credito"].to_numpy() > 0
+    fuera = con_credito & ~clientes["plazo_credito"].between(PLAZO_CREDITO_MIN, PLAZO_CREDITO_MAX).to_numpy()
+    if fuera.any():
+        raise ValueError(f"'plazo_credito' debe ser 0 o estar entre {PLAZO_CREDITO_MIN} y {PLAZO_CREDITO_MAX}: {sorted(set(clientes['plazo_credito'][fuera].tolist()))}")
+    desconocidos = set(clientes["esquema_credito"][con_credito]) - set(ESQUEMAS)
+    if desconocidos:
+        raise ValueError(f"'esquema_credito' desconocido: {sorted(desconocidos)} (usa {' o '.join(ESQUEMAS)})")
+
+    lotes = df['lote'].to_numpy()
+    # "A5" o una celda vacía quedan como NaN y caen en el error de lotes inexistentes
+    pedidos = pd.to_numeric(clientes["lote"], errors='coerce').to_numpy(dtype=float)
+    orden = np.argsort(lotes)
+    pos = np.searchsorted(lotes, pedidos, sorter=orden)
+    pos = np.minimum(pos, len(lotes) - 1)
+    idx = orden[pos]
+    invalidos = lotes[idx] != pedidos
+    if invalidos.any():
+        raise ValueError(f"Lotes inexistentes en la hoja de precios: {sorted(set(clientes['lote'][invalidos].tolist()), key=str)}")
+
+    cot = cotizar(matriz_precios(df), idx, clientes["lista"].to_numpy(), clientes["enganche"].to_numpy(), clientes["plazo"].to_numpy(), precio_futuro)
+    m2_terreno, _ = superficies(df)
+    if precio_futuro is None:
+        # Sin precio a la entrega cada proyección arranca del precio final de su cotización
+        proyecciones = [proyectar_plusvalia(v) for v in cot["precio_final_venta"].tolist()]
+    else:
+        proyecciones = [proyectar_plusvalia(precio_futuro)] * len(clientes)
+    renta = simular_renta(cot["precio_final_venta"], clientes["tarifa"].to_numpy(dtype=float), clientes["ocupacion"].to_numpy(dtype=float) / 100,
+                          clientes["admin"].to_numpy(dtype=float) / 100, clientes["gastos_fijos"].to_numpy(dtype=float))
+
+    return [{
+        "cliente_nombre": clientes["cliente"].iat[i],
+        "asesor_nombre": clientes["asesor"].iat[i],
+        "num_lote_selec": int(lotes[idx[i]]),
+        "m2_terreno": float(m2_terreno[idx[i]]),
+        "precio_lista_base": float(cot["precio_lista_base"][i]),
+        "descuento_pct": float(cot["descuento_pct"][i]),
+        "monto_descuento": float(cot["monto_descuento"][i]),
+        "precio_final_venta": float(cot["precio_final_venta"][i]),
+        "precio_futuro_lista10": precio_futuro,
+        "enganche_pct": int(clientes["enganche"].iat[i]),
+        "monto_enganche": float(cot["monto_enganche"][i]),
+        "plazo_meses": int(clientes["plazo"].iat[i]),
+        "mensualidad": float(cot["mensualidad"][i]),
+        "saldo_final": float(cot["saldo_final"][i]),
+        "plusvalia_preventa": None if precio_futuro is None else float(cot["plusvalia_preventa"][i]),
+        "valor_final_5y": proyecciones[i][-1]['Valor Propiedad'],
+        "neto_bolsillo_est": proyecciones[i][1]['Renta Acumulada'],
+        "roi_renta": float(renta["roi_renta"][i]),
+        "credito": (float(clientes["tasa_credito"].iat[i]) / 100, int(clientes["plazo_credito"].iat[i]),
+                    clientes["esquema_credito"].iat[i], float(clientes["abono_credito"].iat[i])) if con_credito[i] else None,
+    } for i in range(len(clientes))]
+
+def nombre_archivo(n, c):
+    cliente = re.sub(r'[^\w-]+', '_', c["cliente_nombre"]).strip('_') or "cliente"
+    return f"{n:04d}_Cotizacion_{cliente}_{c['num_lote_selec']}.pdf"
+
+def _render(args):
+    n, c = args
+    return nombre_archivo(n, c), create_pdf(c)
+
+def generar_zip(cotizaciones, destino, procesos=None, chunksize=4):
+    """Escribe los PDFs en `destino` conforme los terminan los workers.
+
+    Sólo los PDFs en tránsito viven en memoria; regresa (documentos, segundos).
+    """
+    inicio = time.perf_counter()
+    n = 0
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zf, Pool(procesos) as pool:
+        for nombre, pdf_bytes in pool.imap_unordered(_render, enumerate(cotizaciones, 1), chunksize=chunksize):
+            zf.writestr(nombre, pdf_bytes)
+            n += 1
+    return n, time.perf_counter() - inicio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un ZIP con las cotizaciones en PDF de un CSV de clientes.")
+    parser.add_argument("clientes", help="CSV con columnas cliente, lote y opcionalmente asesor, lista, enganche, plazo")
+    parser.add_argument("-o", "--output", default="cotizaciones.zip", help="ZIP de salida (default: cotizaciones.zip)")
+    parser.add_argument("-j", "--procesos", type=int, default=None, help="Procesos de render (default: núm. de CPUs)")
+    parser.add_argument("--precios", default=ARCHIVO_PRECIOS, help="Hoja de precios (default: precios.csv)")
+    args = parser.parse_args(argv)
+
+    clientes = pd.read_csv(args.clientes)
+    clientes.columns = clientes.columns.str.strip().str.lower()
+    try:
+        cotizaciones = preparar_cotizaciones(clientes, leer_precios(args.precios))
+    except ValueError as e:
+        parser.error(str(e))
+
+    docs, seg = generar_zip(cotizaciones, args.output, args.procesos)
+    print(f"{docs} PDFs -> {args.output} en {seg:.2f}s ({docs / seg if seg else 0:.1f} docs/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
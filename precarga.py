@@ -0,0 +1,42 @@
+"""Precarga en segundo plano de las dependencias pesadas que se importan hasta su primer uso.
+
+`app.py` llama a `precargar()` al final de la primera corrida (la página ya se pintó):
+un hilo importa fpdf, decodifica el logo del PDF y construye las figuras que cualquier
+cotización muestra, para que el primer clic no pague el arranque en frío. plotly no
+hace falta: Streamlit ya importa plotly.io y graficas importa plotly.graph_objects.
+"""
+import importlib
+import threading
+import time
+
+from metricas import registrar
+
+MODULOS = ("fpdf",)
+
+_lock = threading.Lock()
+_hilo = None
+
+
+def _precargar(calentar):
+    inicio = time.perf_counter()
+    for modulo in MODULOS:
+        try: importlib.import_module(modulo)
+        except ImportError: pass
+    from pdf_cotizacion import _logo, clase_pdf
+    try:
+        clase_pdf()
+        _logo()
+    except Exception: pass  # sin logo el PDF se genera igual (ver PDF.header)
+    for fn in calentar:
+        try: fn()
+        except Exception: pass
+    registrar("precarga", time.perf_counter() - inicio)
+
+def precargar(*calentar):
+    """Lanza (una vez por proceso) el hilo de precarga; `calentar` son llamadas extra sin argumentos."""
+    global _hilo
+    with _lock:
+        if _hilo is None:
+            _hilo = threading.Thread(target=_precargar, args=(calentar,), name="precarga", daemon=True)
+            _hilo.start()
+    return _hilo
@@ -0,0 +1,151 @@
+"""Proyección de plusvalía y simulador de rentas (funciones puras)."""
+from functools import lru_cache
+import numpy as np
+
+# --- SUPUESTOS DE PROYECCIÓN ---
+TARIFA_BASE = 4500
+OCUPACION_BASE = 0.45
+INFLACION = 0.05
+PLUSVALIA_ANUAL = 0.08
+FACTOR_NETO_RENTA = 0.70
+AÑOS = range(2027, 2033)
+
+# --- VALORES INICIALES DEL SIMULADOR DE NEGOCIO ---
+TARIFA_DEFAULT = 4500
+OCUPACION_DEFAULT = 0.45
+ADMIN_DEFAULT = 0.25
+GASTOS_FIJOS_DEFAULT = 3000
+
+
+def proyectar_plusvalia(valor_inicial, years=AÑOS):
+    """Filas año a año con valor de la propiedad y renta neta acumulada."""
+    data_proy = []
+    val_prop = valor_inicial
+    acum_rentas = 0
+
+    for i, y in enumerate(years):
+        t_act = TARIFA_BASE * ((1+INFLACION)**i)
+        neto_anual_est = (t_act * 365 * OCUPACION_BASE) * FACTOR_NETO_RENTA
+        if y > years[0]:
+            acum_rentas += neto_anual_est
+        data_proy.append({
+            "Año": y,
+            "Valor Propiedad": val_prop,
+            "Renta Acumulada": acum_rentas,
+            "Total Patrimonio": val_prop + acum_rentas
+        })
+        val_prop *= (1 + PLUSVALIA_ANUAL)
+    return data_proy
+
+def simular_renta(precio_final_venta, tarifa=TARIFA_DEFAULT, ocupacion=OCUPACION_DEFAULT, admin_pct=ADMIN_DEFAULT, gastos_fijos=GASTOS_FIJOS_DEFAULT):
+    """Estado de resultados anual de la renta vacacional.
+
+    Sólo usa aritmética, así que acepta escalares o arreglos de NumPy.
+    """
+    ingreso_bruto = tarifa * 365 * ocupacion
+    gasto_admin = ingreso_bruto * admin_pct
+    gasto_servicios = gastos_fijos * 12
+    total_gastos = gasto_admin + gasto_servicios
+    neto_bolsillo = ingreso_bruto - total_gastos
+    roi_renta = (neto_bolsillo / precio_final_venta) * 100
+    return {
+        "ingreso_bruto": ingreso_bruto,
+        "gasto_admin": gasto_admin,
+        "gasto_servicios": gasto_servicios,
+        "total_gastos": total_gastos,
+        "neto_bolsillo": neto_bolsillo,
+        "roi_renta": roi_renta,
+    }
+
+# --- MODO ESTOCÁSTICO (MONTE CARLO) ---
+TRAYECTORIAS_MC = 100_000
+SEMILLA_MC = 2027
+# Desviaciones estándar anuales alrededor de los supuestos deterministas
+VOL_PLUSVALIA = 0.04
+VOL_INFLACION = 0.015
+VOL_TARIFA = 0.10
+VOL_OCUPACION = 0.08
+PERCENTILES = (10, 50, 90)
+
+
+def simular_montecarlo(valor_inicial, n=TRAYECTORIAS_MC, years=AÑOS, semilla=SEMILLA_MC,
+                       vol_plusvalia=VOL_PLUSVALIA, vol_inflacion=VOL_INFLACION, vol_tarifa=VOL_TARIFA, vol_ocupacion=VOL_OCUPACION):
+    """Bandas P10/P50/P90 de valor de la propiedad y renta neta acumulada.
+
+    Simula `n` trayectorias año a año de plusvalía, inflación, tarifa por noche y
+    ocupación, todo como arreglos (n, años) sin ciclos de Python. Con `vol_* = 0`
+    reproduce exactamente `proyectar_plusvalia`. Regresa un dict con "años" y,
+    para "Valor Propiedad", "Renta Acumulada" y "Total Patrimonio", un arreglo
+    (len(PERCENTILES), años).
+    """
+    rng = np.random.default_rng(semilla)
+    t = len(years)
+    # Crecimiento del año i al i+1; el primer año arranca en el valor inicial
+    plusvalia = rng.normal(PLUSVALIA_ANUAL, vol_plusvalia, (n, t - 1))
+    inflacion = rng.normal(INFLACION, vol_inflacion, (n, t - 1))
+    valor = np.empty((n, t))
+    valor[:, 0] = valor_inicial
+    np.cumprod(1 + plusvalia, axis=1, out=valor[:, 1:])
+    valor[:, 1:] *= valor_inicial
+
+    # Nivel de tarifa propio de cada trayectoria (lognormal) indexado por la inflación simulada
+    tarifa = np.empty((n, t))
+    tarifa[:, 0] = TARIFA_BASE * rng.lognormal(-vol_tarifa ** 2 / 2, vol_tarifa, n) if vol_tarifa else TARIFA_BASE
+    np.cumprod(1 + inflacion, axis=1, out=tarifa[:, 1:])
+    tarifa[:, 1:] *= tarifa[:, :1]
+    ocupacion = np.clip(rng.normal(OCUPACION_BASE, vol_ocupacion, (n, t)), 0.0, 1.0)
+
+    neto_anual = tarifa * 365 * ocupacion * FACTOR_NETO_RENTA
+    neto_anual[:, 0] = 0  # el año de entrega no genera renta
+    rentas = np.cumsum(neto_anual, axis=1)
+
+    bandas = {"años": np.asarray(list(years))}
+    for nombre, trayectorias in (("Valor Propiedad", valor), ("Renta Acumulada", rentas), ("Total Patrimonio", valor + rentas)):
+        bandas[nombre] = np.percentile(trayectorias, PERCENTILES, axis=0)
+    return bandas
+
+@lru_cache(maxsize=32)
+def bandas_montecarlo(valor_inicial):
+    """`simular_montecarlo` con los supuestos por omisión, memoizado por proceso (arreglos de sólo lectura)."""
+    bandas = simular_montecarlo(valor_inicial)
+    for arr in bandas.values(): arr.flags.writeable = False
+    return bandas
+
+# --- SENSIBILIDAD DEL SIMULADOR DE RENTAS ---
+TARIFAS_SENSIBILIDAD = np.arange(1500, 10001, 100)
+OCUPACIONES_SENSIBILIDAD = np.arange(20, 81) / 100
+COMISIONES_SENSIBILIDAD = np.arange(15, 31) / 100
+VARIACION_TORNADO = 0.20
+
+
+def sensibilidad_renta(precio_final_venta, gastos_fijos=GASTOS_FIJOS_DEFAULT, tarifas=TARIFAS_SENSIBILIDAD,
+                       ocupaciones=OCUPACIONES_SENSIBILIDAD, comisiones=COMISIONES_SENSIBILIDAD):
+    """Evalúa `simular_renta` en toda la malla tarifa × ocupación × comisión con un solo broadcast.
+
+    "roi" y "neto" tienen forma (tarifas, ocupaciones, comisiones);
+    "ocupacion_equilibrio" (tarifas, comisiones) es la ocupación con utilidad neta cero.
+    """
+    t, o, a = np.ix_(np.asarray(tarifas, dtype=float), np.asarray(ocupaciones, dtype=float), np.asarray(comisiones, dtype=float))
+    r = simular_renta(precio_final_venta, t, o, a, gastos_fijos)
+    equilibrio = (gastos_fijos * 12) / (t[:, 0, :] * 365 * (1 - a[0, :, :]))
+    return {
+        "tarifas": t.ravel(), "ocupaciones": o.ravel(), "comisiones": a.ravel(),
+        "roi": r["roi_renta"], "neto": r["neto_bolsillo"], "ocupacion_equilibrio": equilibrio,
+    }
+
+def tornado_renta(precio_final_venta, tarifa, ocupacion, admin_pct, gastos_fijos, variacion=VARIACION_TORNADO):
+    """ROI al mover cada variable ±`variacion` dejando las demás fijas, ordenado de mayor a menor impacto.
+
+    Lista de (variable, roi_bajo, roi_alto) más el ROI base.
+    """
+    base = np.array([tarifa, ocupacion, admin_pct, gastos_fijos], dtype=float)
+    escenarios = np.repeat(base[None, :], 8, axis=0)
+    factores = np.array([1 - variacion, 1 + variacion])
+    for j in range(4):
+        escenarios[2 * j:2 * j + 2, j] *= factores
+    escenarios[:, 1] = np.clip(escenarios[:, 1], 0, 1)
+    roi = simular_renta(precio_final_venta, *escenarios.T)["roi_renta"].reshape(4, 2)
+    roi_base = float(simular_renta(precio_final_venta, *base)["roi_renta"])
+    nombres = ("Tarifa Noche", "Ocupación", "Comisión Admin", "Gastos Fijos")
+    filas = sorted(zip(nombres, roi[:, 0].tolist(), roi[:, 1].tolist()), key=lambda f: abs(f[2] - f[1]), reverse=True)
+    return filas, roi_base
@@ -0,0 +1,78 @@
+"""Reporte del costo de importación por módulo en un arranque en frío.
+
+Corre `python -X importtime` en un proceso nuevo (sin cachés de import en memoria)
+y agrupa el resultado por paquete de primer nivel:
+
+    python reporte_arranque.py                       # lo que importa app.py antes de pintar
+    python reporte_arranque.py --top 30 --detalle    # además, los 30 módulos más caros
+    python reporte_arranque.py -m plotly.express fpdf
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+# Lo que app.py importa antes de la primera corrida (las dependencias diferidas no van aquí)
+MODULOS_APP = ("streamlit", "pandas", "numpy", "cotizador", "datos", "proyeccion", "pdf_cotizacion",
+               "amortizacion", "graficas", "auditoria", "inventario", "metricas", "precarga")
+# Dependencias que sólo se cargan en su primer uso o en la precarga (plotly ya viene con streamlit)
+MODULOS_DIFERIDOS = ("fpdf",)
+
+_LINEA = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def medir_imports(modulos):
+    """[(módulo, propio_us, acumulado_us, profundidad)] de importar `modulos` en un proceso nuevo."""
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+    if r.returncode != 0:
+        raise RuntimeError(r.stderr.strip().splitlines()[-1] if r.stderr.strip() else f"código {r.returncode}")
+    filas = []
+    for linea in r.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if m:
+            filas.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return filas
+
+def por_paquete(filas):
+    """{paquete: (propio_ms, núm. de módulos)} sumando el tiempo propio de cada submódulo."""
+    paquetes = {}
+    for modulo, propio, _, _ in filas:
+        raiz = modulo.split(".")[0]
+        ms, n = paquetes.get(raiz, (0.0, 0))
+        paquetes[raiz] = (ms + propio / 1000, n + 1)
+    return dict(sorted(paquetes.items(), key=lambda p: -p[1][0]))
+
+def imprimir(titulo, filas, top, detalle):
+    total = sum(f[1] for f in filas) / 1000
+    print(f"\n== {titulo}: {total:,.0f} ms en {len(filas)} módulos ==")
+    print(f"{'paquete':<28} {'ms':>9} {'%':>6} {'módulos':>8}")
+    for paquete, (ms, n) in list(por_paquete(filas).items())[:top]:
+        print(f"{paquete:<28} {ms:9.1f} {ms / total * 100 if total else 0:6.1f} {n:8d}")
+    if detalle:
+        print(f"\n{'módulo':<50} {'propio ms':>10} {'acum. ms':>10}")
+        for modulo, propio, acumulado, _ in sorted(filas, key=lambda f: -f[1])[:top]:
+            print(f"{modulo:<50} {propio / 1000:10.1f} {acumulado / 1000:10.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Costo de importación por módulo en un arranque en frío.")
+    parser.add_argument("-m", "--modulos", nargs="+", help="Módulos a medir (default: los que importa app.py)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--detalle", action="store_true", help="Lista también los módulos más caros")
+    args = parser.parse_args(argv)
+
+    if args.modulos:
+        imprimir(" ".join(args.modulos), medir_imports(args.modulos), args.top, args.detalle)
+        return 0
+    filas_app = medir_imports(MODULOS_APP)
+    imprimir("Arranque de app.py", filas_app, args.top, args.detalle)
+    cargados = {f[0] for f in filas_app}
+    # Costo de las dependencias diferidas sobre lo que ya está cargado (lo que paga la precarga)
+    filas_dif = [f for f in medir_imports(MODULOS_APP + MODULOS_DIFERIDOS) if f[0] not in cargados]
+    imprimir("Diferido (primer uso / precarga)", filas_dif, args.top, args.detalle)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Servicio HTTP local de cotizaciones (sin Streamlit) para el CRM y el bot de WhatsApp.
+
+Usa el mismo motor que app.py (`cotizador`, `proyeccion`, `pdf_cotizacion`) y sólo
+la biblioteca estándar: un servidor asyncio que atiende JSON en el event loop y
+manda el render de los PDFs (CPU) a un pool de procesos.
+
+    python servicio.py --port 8601 --workers 2
+
+Endpoints:
+    GET  /salud                          -> {"ok": true}
+    GET  /desarrollos                    -> ["Ananda Kino", ...]
+    GET  /lotes?desarrollo=..&status=..  -> [{"lote": 1, "status": "Disponible"}, ...]
+    GET  /metrics                        -> tiempos y contadores en formato de texto de Prometheus
+    POST /cotizacion   {lote, lista, enganche, plazo, cliente, asesor, desarrollo, ...} -> cifras de la cotización
+    POST /cotizaciones {"cotizaciones": [{...}, ...]}                                   -> lista de cotizaciones
+    POST /pdf          {mismo cuerpo que /cotizacion}                                   -> application/pdf
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from datos import DESARROLLO_DEFAULT, PRECIOS_FUTUROS, desarrollos, leer_precios
+from inventario import Inventario
+from metricas import contar, prometheus, tramo
+from pdf_cotizacion import pdf_cotizacion
+from pdf_lote import COLUMNAS_DEFAULT, preparar_cotizaciones
+
+# Tamaño máximo del cuerpo de una petición (bytes)
+MAX_CUERPO = 1 << 20
+RUTAS = ("/salud", "/metrics", "/desarrollos", "/lotes", "/cotizacion", "/cotizaciones", "/pdf")
+ESTADOS_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, codigo, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+class ServicioCotizaciones:
+    def __init__(self, workers=None):
+        self.hojas = desarrollos()
+        self.precios = {}
+        self.inventario = Inventario()
+        # Igual que app.py: las hojas sólo siembran los lotes que aún no existen en la base
+        for nombre in self.hojas:
+            df = self.hoja(nombre)
+            self.inventario.sembrar(nombre, df['lote'], df['status'])
+        self.pool = ProcessPoolExecutor(workers)
+
+    def hoja(self, desarrollo):
+        if desarrollo not in self.hojas:
+            raise ErrorHTTP(404, f"Desarrollo desconocido: {desarrollo}")
+        if desarrollo not in self.precios:
+            self.precios[desarrollo] = leer_precios(self.hojas[desarrollo])
+        return self.precios[desarrollo]
+
+    def cotizar(self, peticiones):
+        """Cotiza un lote de peticiones JSON (una pasada vectorizada por desarrollo)."""
+        if not peticiones:
+            return []
+        columnas = ("cliente", "lote") + tuple(COLUMNAS_DEFAULT)
+        resultado = [None] * len(peticiones)
+        por_desarrollo = {}
+        for i, p in enumerate(peticiones):
+            if not isinstance(p, dict) or "lote" not in p:
+                raise ErrorHTTP(400, "Cada cotización necesita al menos 'lote'")
+            por_desarrollo.setdefault(p.get("desarrollo", DESARROLLO_DEFAULT), []).append(i)
+        for desarrollo, indices in por_desarrollo.items():
+            clientes = pd.DataFrame([{c: peticiones[i][c] for c in columnas if c in peticiones[i]} for i in indices])
+            if "cliente" not in clientes.columns: clientes["cliente"] = ""
+            clientes["lote"] = pd.to_numeric(clientes["lote"], errors='coerce')
+            try:
+                cotizaciones = preparar_cotizaciones(clientes, self.hoja(desarrollo), PRECIOS_FUTUROS.get(desarrollo))
+            except ValueError as e:
+                raise ErrorHTTP(400, str(e))
+            for i, c in zip(indices, cotizaciones):
+                resultado[i] = dict(c, desarrollo=desarrollo)
+        return resultado
+
+    def lotes(self, desarrollo, status=None):
+        if desarrollo not in self.hojas:
+            raise ErrorHTTP(404, f"Desarrollo desconocido: {desarrollo}")
+        if status:
+            return [{"lote": l, "status": status} for l in self.inventario.lotes_con_status(desarrollo, status)]
+        return [{"lote": l, "status": s} for l, s in self.inventario.estados(desarrollo).items()]
+
+    async def atender(self, metodo, ruta, consulta, cuerpo):
+        """Regresa (código, content-type, bytes) de una petición ya parseada."""
+        if ruta == "/salud" and metodo == "GET":
+            return _json(200, {"ok": True})
+        if ruta == "/metrics" and metodo == "GET":
+            return 200, "text/plain; version=0.0.4; charset=utf-8", prometheus().encode('utf-8')
+        if ruta == "/desarrollos" and metodo == "GET":
+            return _json(200, list(self.hojas))
+        if ruta == "/lotes" and metodo == "GET":
+            desarrollo = consulta.get("desarrollo", [DESARROLLO_DEFAULT])[0]
+            return _json(200, self.lotes(desarrollo, consulta.get("status", [None])[0]))
+        if ruta in ("/cotizacion", "/cotizaciones", "/pdf"):
+            if metodo != "POST":
+                raise ErrorHTTP(405, "Usa POST")
+            datos = _leer_json(cuerpo)
+            if ruta == "/cotizaciones":
+                if not isinstance(datos, dict) or not isinstance(datos.get("cotizaciones"), list):
+                    raise ErrorHTTP(400, "Se esperaba {\"cotizaciones\": [...]}")
+                return _json(200, self.cotizar(datos["cotizaciones"]))
+            c = self.cotizar([datos])[0]
+            if ruta == "/cotizacion":
+                return _json(200, c)
+            c.pop("desarrollo")
+            pdf = await asyncio.get_running_loop().run_in_executor(self.pool, pdf_cotizacion, c)
+            # El render ocurre en otro proceso: aquí se cuentan los bytes que salen por HTTP
+            contar("pdf_bytes_servidos", len(pdf))
+            return 200, "application/pdf", pdf
+        raise ErrorHTTP(404, f"No existe {ruta}")
+
+    async def conexion(self, reader, writer):
+        # HTTP/1.1 mínimo con keep-alive: una petición a la vez por conexión
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, objetivo, _ = linea.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                encabezados = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = h.decode('latin-1').partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip()
+                url = urlsplit(objetivo)
+                largo = None
+                try:
+                    largo = _largo_cuerpo(encabezados)
+                    if largo > MAX_CUERPO:
+                        raise ErrorHTTP(413, "Cuerpo demasiado grande")
+                    cuerpo = await reader.readexactly(largo) if largo else b''
+                    ruta = url.path.rstrip('/') or '/'
+                    with tramo(f"servicio_{ruta.strip('/') if ruta in RUTAS else 'otra'}"):
+                        codigo, tipo, datos = await self.atender(metodo, ruta, parse_qs(url.query), cuerpo)
+                except ErrorHTTP as e:
+                    codigo, tipo, datos = _json(e.codigo, {"error": str(e)})
+                except Exception as e:
+                    codigo, tipo, datos = _json(500, {"error": f"{type(e).__name__}: {e}"})
+                # Sin un largo válido no se sabe dónde empieza la siguiente petición: se cierra
+                cerrar = encabezados.get('connection', '').lower() == 'close' or codigo == 413 or largo is None
+                writer.write(
+                    f"HTTP/1.1 {codigo} {ESTADOS_HTTP.get(codigo, '')}\r\nContent-Type: {tipo}\r\n"
+                    f"Content-Length: {len(datos)}\r\nConnection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode('latin-1') + datos)
+                await writer.drain()
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+def _largo_cuerpo(encabezados):
+    valor = encabezados.get('content-length', '') or '0'
+    # Sólo dígitos ASCII: rechaza "abc", negativos y signos
+    if not (valor.isascii() and valor.isdigit()):
+        raise ErrorHTTP(400, f"Content-Length inválido: {valor!r}")
+    return int(valor)
+
+def _json(codigo, obj):
+    return codigo, "application/json; charset=utf-8", json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def _leer_json(cuerpo):
+    try:
+        return json.loads(cuerpo or b'{}')
+    except ValueError:
+        raise ErrorHTTP(400, "El cuerpo no es JSON válido")
+
+async def servir(host, port, workers):
+    servicio = ServicioCotizaciones(workers)
+    servidor = await asyncio.start_server(servicio.conexion, host, port)
+    print(f"Servicio de cotizaciones en http://{host}:{port}", file=sys.stderr)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.pool.shutdown(cancel_futures=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de cotizaciones de Ananda Kino.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("--workers", type=int, default=None, help="Procesos para renderizar PDFs (default: núm. de CPUs)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""La tabla en forma cerrada de `amortizar` contra una referencia que recorre el plazo mes por mes."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amortizacion import ALEMAN, COLUMNAS_TABLA, FRANCES, abonos_periodicos, amortizar, pago_frances
+
+
+def amortizar_mes_a_mes(saldo, tasa_anual, meses, esquema=FRANCES, abonos=None):
+    r = tasa_anual / 12
+    extra = np.zeros(meses) if abonos is None else np.asarray(abonos, dtype=float)
+    pago = pago_frances(saldo, tasa_anual, meses)
+    capital_fijo = saldo / meses  # alemán: capital fijo sobre el saldo original
+    filas = []
+    for mes in range(1, meses + 1):
+        interes = saldo * r
+        capital = min(pago - interes if esquema == FRANCES else capital_fijo, saldo)
+        abono = min(extra[mes - 1], saldo - capital)
+        restante = saldo - capital - abono
+        # El último pago (por plazo o por abonos) se ajusta para dejar el saldo en cero
+        if mes == meses or restante <= 0.005:
+            abono, restante = saldo - capital, 0.0
+        filas.append((mes, interes + capital, interes, capital, abono, restante))
+        saldo = restante
+        if restante == 0.0:
+            break
+    return {c: np.array(v) for c, v in zip(COLUMNAS_TABLA, zip(*filas))}
+
+@pytest.mark.parametrize("esquema", [FRANCES, ALEMAN])
+@pytest.mark.parametrize("tasa", [0.0, 0.05, 0.115, 0.25])
+@pytest.mark.parametrize("meses", [60, 240, 360])
+@pytest.mark.parametrize("abono_anual,abono_unico", [(0, 0), (50_000, 0), (0, 400_000), (150_000, 1_000_000)])
+def test_forma_cerrada_igual_a_mes_a_mes(esquema, tasa, meses, abono_anual, abono_unico):
+    abonos = abonos_periodicos(meses, abono_anual, abono_unico, mes_unico=18)
+    tabla = amortizar(2_500_000.0, tasa, meses, esquema, abonos)
+    referencia = amortizar_mes_a_mes(2_500_000.0, tasa, meses, esquema, abonos)
+    assert len(tabla["mes"]) == len(referencia["mes"])
+    for columna in COLUMNAS_TABLA:
+        np.testing.assert_allclose(tabla[columna], referencia[columna], rtol=1e-9, atol=1e-3, err_msg=columna)
+
+def test_tabla_cuadra_con_el_saldo():
+    tabla = amortizar(2_500_000.0, 0.115, 240, ALEMAN, abonos_periodicos(240, 80_000))
+    assert tabla["saldo"][-1] == 0.0
+    assert tabla["capital"].sum() + tabla["abono"].sum() == pytest.approx(2_500_000.0)
+
+def test_plazo_fuera_de_rango():
+    with pytest.raises(ValueError):
+        amortizar(1_000_000.0, 0.1, 12)
@@ -0,0 +1,105 @@
+"""Escritor de fondo de la bitácora: lotes de escritura, vaciado al salir y rotación mensual."""
+import os
+import sqlite3
+import sys
+import types
+from datetime import date, datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auditoria
+from auditoria import COTIZACION, PDF, Auditoria
+
+
+class Reloj(datetime):
+    """`datetime` con `now()` fijo en `Reloj.ahora` (el fixture `reloj` lo reinicia)."""
+    ahora = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.ahora
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    monkeypatch.setattr(Reloj, "ahora", datetime(2026, 1, 31, 23, 59, 58))
+    monkeypatch.setattr(auditoria, "datetime", Reloj)
+    # Sin esperar INTERVALO: las pruebas deciden cuándo están encolados los registros
+    monkeypatch.setattr(auditoria, "time", types.SimpleNamespace(sleep=lambda s: None))
+    monkeypatch.setattr(auditoria.atexit, "register", lambda *args: None)
+    return Reloj
+
+@pytest.fixture
+def bitacora(tmp_path, reloj):
+    return Auditoria(str(tmp_path / "auditoria"))
+
+def filas(bitacora, mes):
+    con = sqlite3.connect(bitacora.ruta(mes))
+    try:
+        return con.execute("SELECT lote, fecha FROM cotizaciones ORDER BY id").fetchall()
+    finally:
+        con.close()
+
+
+def test_escribe_por_lotes(bitacora, monkeypatch):
+    monkeypatch.setattr(auditoria, "LOTE_ESCRITURA", 10)
+    lotes = []
+    escribir = bitacora._escribir
+    bitacora._escribir = lambda conexiones, registros: (lotes.append(len(registros)), escribir(conexiones, registros))
+    # Todo encolado antes de arrancar el escritor para que los lotes sean deterministas
+    bitacora._iniciar = lambda: None
+    for lote in range(1, 26):
+        assert bitacora.registrar(COTIZACION, lote=lote)
+    del bitacora._iniciar
+    bitacora._iniciar()
+    assert bitacora.vaciar(5)
+    assert lotes == [10, 10, 5]
+    assert [f[0] for f in filas(bitacora, "2026-01")] == list(range(1, 26))
+
+def test_vaciar_al_salir(tmp_path, reloj, monkeypatch):
+    al_salir = []
+    monkeypatch.setattr(auditoria.atexit, "register", lambda fn, *args: al_salir.append((fn, args)))
+    bitacora = Auditoria(str(tmp_path / "auditoria"))
+    for lote in range(1, 4):
+        bitacora.registrar(PDF, lote=lote)
+    assert al_salir == [(bitacora.vaciar, (5,))]
+    fn, args = al_salir[0]
+    assert fn(*args)
+    assert bitacora.pendientes() == 0
+    assert len(filas(bitacora, "2026-01")) == 3
+
+def test_rota_por_mes(bitacora, reloj):
+    bitacora.registrar(COTIZACION, lote=1)
+    assert bitacora.vaciar(5)
+    reloj.ahora = datetime(2026, 2, 1, 0, 0, 1)
+    bitacora.registrar(COTIZACION, lote=2)
+    assert bitacora.vaciar(5)
+    assert sorted(f for f in os.listdir(bitacora.directorio) if f.endswith(".db")) == ["cotizaciones_2026-01.db", "cotizaciones_2026-02.db"]
+    assert filas(bitacora, "2026-01") == [(1, "2026-01-31T23:59:58")]
+    assert filas(bitacora, "2026-02") == [(2, "2026-02-01T00:00:01")]
+    # Las consultas juntan los archivos de todos los meses del rango
+    assert [r["lote"] for r in bitacora.registros(date(2026, 1, 1), date(2026, 2, 28))] == [2, 1]
+    assert bitacora.conteo("evento", date(2026, 1, 1), date(2026, 2, 28)) == {COTIZACION: 2}
+
+def test_suelta_la_conexion_del_mes_anterior(bitacora):
+    conexiones = {}
+    bitacora._escribir(conexiones, [("2026-01-15T10:00:00", COTIZACION) + (None,) * 11])
+    enero = conexiones["2026-01"]
+    bitacora._escribir(conexiones, [("2026-02-01T10:00:00", COTIZACION) + (None,) * 11])
+    assert list(conexiones) == ["2026-02"]
+    with pytest.raises(sqlite3.ProgrammingError):
+        enero.execute("SELECT 1")
+    conexiones["2026-02"].close()
+
+def test_solo_insercion(bitacora):
+    bitacora.registrar(COTIZACION, lote=1)
+    assert bitacora.vaciar(5)
+    con = sqlite3.connect(bitacora.ruta("2026-01"))
+    try:
+        for sql in ("UPDATE cotizaciones SET lote = 2", "DELETE FROM cotizaciones"):
+            with pytest.raises(sqlite3.IntegrityError, match="sólo inserción"):
+                con.execute(sql)
+    finally:
+        con.close()
@@ -0,0 +1,31 @@
+"""Validaciones de entrada del motor de cotización."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cotizador import NUM_LISTAS, cotizar, optimizar_planes
+
+PRECIOS = np.full((3, NUM_LISTAS), 3_300_000.0)
+
+
+@pytest.mark.parametrize("lista", [0, NUM_LISTAS + 1, -1, [1, 0]])
+def test_lista_fuera_de_rango(lista):
+    with pytest.raises(ValueError, match="lista"):
+        cotizar(PRECIOS, 0, lista, 30, 12)
+
+def test_listas_validas():
+    cot = cotizar(PRECIOS, [0, 2], [1, NUM_LISTAS], 30, 12)
+    assert cot["precio_lista_base"].tolist() == [3_300_000.0, 3_300_000.0]
+
+def test_optimizador_lista_fuera_de_rango():
+    with pytest.raises(ValueError, match="lista"):
+        optimizar_planes(PRECIOS, listas=[NUM_LISTAS + 1])
+
+def test_sin_precio_futuro():
+    cot = cotizar(PRECIOS, [0, 1], 1, 30, 12, precio_futuro=None)
+    assert np.isnan(cot["plusvalia_preventa"]).all()
+    assert np.isfinite(cot["precio_final_venta"]).all()
@@ -0,0 +1,77 @@
+"""Vigencia del snapshot `.npz` de la hoja de precios."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datos
+from datos import leer_precios
+
+HOJA = 'LOTE,Total Terreno,Total Construccion,Lista 1\n1,216,128.8," $ 3,000,000 "\n2,216,128.8," $ 3,100,000 "\n'
+
+
+@pytest.fixture
+def hoja(tmp_path, monkeypatch):
+    monkeypatch.setattr(datos, "CACHE_DIR", str(tmp_path / "cache"))
+    ruta = tmp_path / "precios.csv"
+    ruta.write_text(HOJA)
+    return ruta
+
+@pytest.fixture
+def parseos(monkeypatch):
+    """Lista que crece con cada parseo real del CSV (un fallo del snapshot)."""
+    llamadas = []
+    parsear = datos.parsear_precios
+    monkeypatch.setattr(datos, "parsear_precios", lambda f: llamadas.append(f) or parsear(f))
+    return llamadas
+
+def mover_mtime(ruta, segundos=60):
+    st = os.stat(ruta)
+    os.utime(ruta, ns=(st.st_atime_ns, st.st_mtime_ns + segundos * 10**9))
+
+
+def test_reutiliza_el_snapshot(hoja, parseos):
+    primera = leer_precios(str(hoja))
+    segunda = leer_precios(str(hoja))
+    assert len(parseos) == 1
+    assert segunda.equals(primera)
+    assert os.path.exists(datos._ruta_snapshot(str(hoja)))
+
+def test_invalida_si_cambia_el_contenido(hoja, parseos):
+    assert leer_precios(str(hoja))["lista_1"].tolist() == [3_000_000.0, 3_100_000.0]
+    hoja.write_text(HOJA + '3,216,128.8," $ 3,200,000 "\n')
+    assert leer_precios(str(hoja))["lista_1"].tolist() == [3_000_000.0, 3_100_000.0, 3_200_000.0]
+    assert len(parseos) == 2
+
+def test_invalida_mismo_tamaño_con_otro_contenido(hoja, parseos):
+    leer_precios(str(hoja))
+    # Mismo tamaño: sólo el mtime distinto y el hash delatan el cambio
+    hoja.write_text(HOJA.replace("3,100,000", "3,900,000"))
+    mover_mtime(hoja)
+    assert leer_precios(str(hoja))["lista_1"].tolist() == [3_000_000.0, 3_900_000.0]
+    assert len(parseos) == 2
+
+def test_solo_cambia_el_mtime(hoja, parseos):
+    primera = leer_precios(str(hoja))
+    mover_mtime(hoja)
+    # El hash del CSV coincide: se reutiliza el snapshot aunque la firma ya no
+    assert leer_precios(str(hoja)).equals(primera)
+    assert len(parseos) == 1
+
+def test_invalida_con_otra_version(hoja, parseos, monkeypatch):
+    leer_precios(str(hoja))
+    monkeypatch.setattr(datos, "VERSION_SNAPSHOT", datos.VERSION_SNAPSHOT + 1)
+    leer_precios(str(hoja))
+    assert len(parseos) == 2
+    # El snapshot se reescribió con la versión nueva
+    leer_precios(str(hoja))
+    assert len(parseos) == 2
+
+def test_snapshot_corrupto(hoja, parseos):
+    primera = leer_precios(str(hoja))
+    with open(datos._ruta_snapshot(str(hoja)), "wb") as f:
+        f.write(b"no es un npz")
+    assert leer_precios(str(hoja)).equals(primera)
+    assert len(parseos) == 2
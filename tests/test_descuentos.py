@@ -0,0 +1,36 @@
+"""La tabla densa de descuentos contra la semántica escalonada de TABLA_DESCUENTOS."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cotizador import MAX_ENGANCHE, OPCIONES_PLAZO, TABLA_DESCUENTOS, obtener_descuento, obtener_descuentos
+
+
+def descuento_escalonado(plazo, enganche):
+    # Semántica original del dict: el nivel más alto <= enganche, 0.0 si no hay
+    if plazo not in TABLA_DESCUENTOS: return 0.0
+    for nivel in sorted(TABLA_DESCUENTOS[plazo], reverse=True):
+        if enganche >= nivel: return TABLA_DESCUENTOS[plazo][nivel]
+    return 0.0
+
+# Incluye plazos y enganches fuera de rango y los niveles inexistentes (0.0)
+PLAZOS = np.arange(-1, max(OPCIONES_PLAZO) + 2)
+ENGANCHES = np.arange(-1, MAX_ENGANCHE + 2)
+ESPERADO = np.array([[descuento_escalonado(int(p), int(e)) for e in ENGANCHES] for p in PLAZOS])
+
+
+def test_obtener_descuento():
+    obtenido = np.array([[obtener_descuento(int(p), int(e)) for e in ENGANCHES] for p in PLAZOS])
+    np.testing.assert_array_equal(obtenido, ESPERADO)
+
+def test_obtener_descuentos():
+    np.testing.assert_array_equal(obtener_descuentos(PLAZOS[:, None], ENGANCHES[None, :]), ESPERADO)
+
+@pytest.mark.parametrize("plazo, enganche", [(12, np.nan), (12.5, 30), (-3, 30), (12, -0.5)])
+def test_entradas_invalidas(plazo, enganche):
+    assert obtener_descuento(plazo, enganche) == 0.0
+    assert obtener_descuentos(plazo, enganche) == 0.0
@@ -0,0 +1,86 @@
+"""Apartar/vender/liberar: los UPDATE condicionales no dejan que dos asesores se queden con el mismo lote."""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventario import APARTADO, DISPONIBLE, VENDIDO, Inventario
+
+KINO, OTRO = "Ananda Kino", "Otro Desarrollo"
+
+
+@pytest.fixture
+def inv(tmp_path):
+    inv = Inventario(str(tmp_path / "inventario.db"))
+    inv.sembrar(KINO, [1, 2, 3], [DISPONIBLE, DISPONIBLE, VENDIDO])
+    inv.sembrar(OTRO, [1], [DISPONIBLE])
+    return inv
+
+
+def test_doble_apartado(inv):
+    version = inv.version()
+    assert inv.reservar(KINO, 1, "ana", "cliente a")
+    assert not inv.reservar(KINO, 1, "luis", "cliente b")
+    assert not inv.reservar(KINO, 1, "ana", "cliente c")
+    lote = inv.lote(KINO, 1)
+    assert (lote["status"], lote["asesor"], lote["cliente"]) == (APARTADO, "ana", "cliente a")
+    # Sólo la escritura que ganó sube la versión
+    assert inv.version() == version + 1
+
+def test_otro_asesor_no_vende_un_apartado(inv):
+    assert inv.reservar(KINO, 1, "ana")
+    assert not inv.vender(KINO, 1, "luis", "cliente b")
+    assert inv.lote(KINO, 1)["status"] == APARTADO
+    assert inv.vender(KINO, 1, "ana", "cliente a")
+    assert (inv.lote(KINO, 1)["status"], inv.lote(KINO, 1)["asesor"]) == (VENDIDO, "ana")
+
+def test_vender_disponible_y_vendido(inv):
+    assert inv.vender(KINO, 2, "luis")
+    assert not inv.vender(KINO, 2, "ana")
+    assert not inv.reservar(KINO, 3, "ana")
+
+def test_liberar_solo_el_asesor_del_apartado(inv):
+    assert inv.reservar(KINO, 1, "ana", "cliente a")
+    assert not inv.liberar(KINO, 1, "luis")
+    assert inv.liberar(KINO, 1, "ana")
+    lote = inv.lote(KINO, 1)
+    assert (lote["status"], lote["asesor"], lote["cliente"]) == (DISPONIBLE, "", "")
+    # Un lote vendido no se libera
+    assert not inv.liberar(KINO, 3, "")
+
+def test_desarrollos_independientes(inv):
+    assert inv.reservar(KINO, 1, "ana")
+    assert inv.reservar(OTRO, 1, "luis")
+    assert inv.estados(OTRO) == {1: APARTADO}
+    assert inv.lotes_con_status(KINO, APARTADO) == [1]
+
+def test_sembrar_conserva_estados(inv):
+    assert inv.reservar(KINO, 1, "ana")
+    version = inv.version()
+    inv.sembrar(KINO, [1, 2, 3, 4], [DISPONIBLE] * 4)
+    assert inv.estados(KINO) == {1: APARTADO, 2: DISPONIBLE, 3: VENDIDO, 4: DISPONIBLE}
+    assert inv.version() == version + 1
+    inv.sembrar(KINO, [1, 2], [DISPONIBLE] * 2)
+    assert inv.version() == version + 1
+
+@pytest.mark.parametrize("compartido", [True, False], ids=["misma_instancia", "una_instancia_por_hilo"])
+def test_carrera_de_apartados(inv, compartido):
+    n = 16
+    barrera = threading.Barrier(n)
+    ganadores = []
+
+    def asesor(i):
+        propio = inv if compartido else Inventario(inv.ruta)
+        barrera.wait(timeout=10)
+        if propio.reservar(KINO, 2, f"asesor {i}"):
+            ganadores.append(f"asesor {i}")
+
+    hilos = [threading.Thread(target=asesor, args=(i,)) for i in range(n)]
+    for h in hilos: h.start()
+    for h in hilos: h.join()
+    assert len(ganadores) == 1
+    lote = inv.lote(KINO, 2)
+    assert (lote["status"], lote["asesor"]) == (APARTADO, ganadores[0])
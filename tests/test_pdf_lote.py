@@ -0,0 +1,26 @@
+"""Validación del CSV de clientes de la generación masiva de PDFs."""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos import leer_precios
+from pdf_lote import preparar_cotizaciones
+
+
+@pytest.fixture(scope="module")
+def hoja():
+    return leer_precios(usar_snapshot=False)
+
+@pytest.mark.parametrize("lote", ["A5", "", None, 99])
+def test_lote_inexistente(hoja, lote):
+    clientes = pd.DataFrame({"cliente": ["Ana", "Luis"], "lote": [lote, 3]})
+    with pytest.raises(ValueError, match="Lotes inexistentes"):
+        preparar_cotizaciones(clientes, hoja)
+
+def test_lote_como_texto(hoja):
+    cotizaciones = preparar_cotizaciones(pd.DataFrame({"cliente": ["Ana", "Luis"], "lote": ["7", 3]}), hoja)
+    assert [c["num_lote_selec"] for c in cotizaciones] == [7, 3]
@@ -0,0 +1,54 @@
+"""Cotizaciones del servicio HTTP por desarrollo (sin abrir sockets)."""
+import asyncio
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datos
+import servicio
+from cotizador import PRECIO_FUTURO_LISTA10
+from datos import ARCHIVO_PRECIOS, DESARROLLO_DEFAULT
+from inventario import Inventario
+from proyeccion import proyectar_plusvalia
+
+OTRO = "Otro Desarrollo"
+
+
+@pytest.fixture
+def svc(tmp_path, monkeypatch):
+    hoja_otro = tmp_path / "otro_desarrollo.csv"
+    shutil.copy(ARCHIVO_PRECIOS, hoja_otro)
+    monkeypatch.setattr(datos, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(servicio, "desarrollos", lambda: {DESARROLLO_DEFAULT: ARCHIVO_PRECIOS, OTRO: str(hoja_otro)})
+    monkeypatch.setattr(servicio, "Inventario", lambda: Inventario(str(tmp_path / "inventario.db")))
+    s = servicio.ServicioCotizaciones(workers=1)
+    yield s
+    s.pool.shutdown()
+
+def test_desarrollo_con_precio_futuro(svc):
+    c, = svc.cotizar([{"lote": 5}])
+    assert c["precio_futuro_lista10"] == PRECIO_FUTURO_LISTA10
+    assert c["plusvalia_preventa"] == pytest.approx(PRECIO_FUTURO_LISTA10 - c["precio_final_venta"])
+    assert c["valor_final_5y"] == proyectar_plusvalia(PRECIO_FUTURO_LISTA10)[-1]["Valor Propiedad"]
+
+def test_desarrollo_sin_precio_futuro(svc):
+    ananda, otro = svc.cotizar([{"lote": 5}, {"lote": 5, "desarrollo": OTRO}])
+    assert otro["desarrollo"] == OTRO
+    assert otro["precio_futuro_lista10"] is None and otro["plusvalia_preventa"] is None
+    # La proyección arranca del precio final de la cotización, no del precio a la entrega de Ananda Kino
+    assert otro["valor_final_5y"] == proyectar_plusvalia(otro["precio_final_venta"])[-1]["Valor Propiedad"]
+    assert otro["valor_final_5y"] != ananda["valor_final_5y"]
+    assert otro["neto_bolsillo_est"] == ananda["neto_bolsillo_est"]
+
+def test_endpoints_sin_precio_futuro(svc):
+    cuerpo = json.dumps({"lote": 5, "desarrollo": OTRO}).encode()
+    codigo, tipo, datos_json = asyncio.run(svc.atender("POST", "/cotizacion", {}, cuerpo))
+    c = json.loads(datos_json)
+    assert codigo == 200 and c["precio_futuro_lista10"] is None and c["plusvalia_preventa"] is None
+    codigo, tipo, pdf = asyncio.run(svc.atender("POST", "/pdf", {}, cuerpo))
+    assert codigo == 200 and tipo == "application/pdf" and pdf.startswith(b"%PDF")